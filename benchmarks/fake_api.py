@@ -0,0 +1,238 @@
+"""Synthetic Sure Petcare accounts behind an in-process fake Surepy."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import random
+import re
+from typing import Any
+
+# Product ids as used by the Sure Petcare API
+HUB = 1
+PET_FLAP = 3
+FEEDER = 4
+CAT_FLAP = 6
+FELAQUA = 8
+
+
+@dataclass
+class AccountShape:
+    """Size of a synthetic account."""
+
+    households: int
+    pets_per_household: int
+    devices_per_household: int
+    # Share of pets moving and flaps changing lock state on every fetch
+    churn: float = 0.05
+    seed: int = 0
+
+    @property
+    def pets(self) -> int:
+        """Return the number of pets on the account."""
+        return self.households * self.pets_per_household
+
+    @property
+    def devices(self) -> int:
+        """Return the number of devices on the account."""
+        return self.households * self.devices_per_household
+
+
+class SyntheticAccount:
+    """Generate API responses for an account shape.
+
+    Every fetch returns new objects, like a real API response, with a share
+    of pets and flaps changed according to the churn.
+    """
+
+    def __init__(self, shape: AccountShape) -> None:
+        """Initialize."""
+        self.shape = shape
+        self._random = random.Random(shape.seed)
+        self.now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.pet_state: dict[int, dict[str, Any]] = {}
+        self.device_state: dict[int, dict[str, Any]] = {}
+
+        next_id = 1000
+        for household in range(shape.households):
+            household_id = 100 + household
+            for index in range(shape.devices_per_household):
+                # Every household has a hub, the rest cycles through the device types
+                product_id = HUB if index == 0 else (PET_FLAP, CAT_FLAP, FEEDER, FELAQUA)[index % 4]
+                self.device_state[next_id] = {
+                    "household_id": household_id,
+                    "name": f"Device {next_id}",
+                    "product_id": product_id,
+                    "locking": 0,
+                    "low_battery": False,
+                    "since": self.now,
+                }
+                next_id += 1
+            for _ in range(shape.pets_per_household):
+                self.pet_state[next_id] = {
+                    "household_id": household_id,
+                    "name": f"Pet {next_id}",
+                    "where": 1,
+                    "since": self.now,
+                }
+                next_id += 1
+
+    @property
+    def household_ids(self) -> list[int]:
+        """Return the household ids of the account."""
+        return [100 + household for household in range(self.shape.households)]
+
+    def advance(self) -> None:
+        """Move some pets, change some flaps and drain some batteries."""
+        self.now += timedelta(minutes=3)
+        for state in self._random.sample(
+            list(self.pet_state.values()), int(len(self.pet_state) * self.shape.churn)
+        ):
+            state["where"] = 2 if state["where"] == 1 else 1
+            state["since"] = self.now
+        for state in self._random.sample(
+            list(self.device_state.values()), int(len(self.device_state) * self.shape.churn)
+        ):
+            if state["product_id"] in (PET_FLAP, CAT_FLAP):
+                state["locking"] = (state["locking"] + 1) % 4
+            if state["product_id"] != HUB:
+                state["low_battery"] = not state["low_battery"]
+            state["since"] = self.now
+
+    def build(self) -> dict[str, Any]:
+        """Return the data of a me/start response for the current state."""
+        return {
+            "households": self.households(),
+            "devices": [self.device(device_id) for device_id in self.device_state],
+            "pets": [self.pet(pet_id) for pet_id in self.pet_state],
+            "user": {"id": 1},
+        }
+
+    def positions(self) -> list[dict[str, Any]]:
+        """Return the position of every pet in API form."""
+        return [
+            {
+                "id": pet_id,
+                "household_id": state["household_id"],
+                "position": {"where": state["where"], "since": state["since"].isoformat()},
+            }
+            for pet_id, state in self.pet_state.items()
+        ]
+
+    def households(self) -> list[dict[str, Any]]:
+        """Return the households in API form."""
+        return [
+            {"id": household_id, "name": f"Household {household_id}", "timezone": {"timezone": "UTC"}}
+            for household_id in self.household_ids
+        ]
+
+    @staticmethod
+    def control(state: dict[str, Any]) -> dict[str, Any]:
+        """Return the control block of a device."""
+        control: dict[str, Any] = {}
+        if state["product_id"] in (PET_FLAP, CAT_FLAP):
+            control["locking"] = state["locking"]
+            control["curfew"] = state.get(
+                "curfew", [{"enabled": True, "lock_time": "22:00", "unlock_time": "06:30"}]
+            )
+        return control
+
+    def device(self, device_id: int) -> dict[str, Any]:
+        """Return a device in API form."""
+        state = self.device_state[device_id]
+        product_id = state["product_id"]
+        status: dict[str, Any] = {"online": True, "signal": {"device_rssi": -60.0, "hub_rssi": -55.0}}
+        if product_id != HUB:
+            status["battery"] = 4.6 if state["low_battery"] else 5.9
+        if product_id in (PET_FLAP, CAT_FLAP):
+            status["locking"] = {"mode": state["locking"]}
+        if product_id in (FEEDER, FELAQUA):
+            status["bowl_status"] = []
+        return {
+            "id": device_id,
+            "product_id": product_id,
+            "household_id": state["household_id"],
+            "name": state["name"],
+            "serial_number": f"SN{device_id:08d}",
+            "mac_address": f"{device_id:016X}",
+            "parent_device_id": None if product_id == HUB else device_id,
+            "updated_at": state["since"].isoformat(),
+            "control": self.control(state),
+            "status": status,
+        }
+
+    def pet(self, pet_id: int) -> dict[str, Any]:
+        """Return a pet in API form."""
+        state = self.pet_state[pet_id]
+        position = {"where": state["where"], "since": state["since"].isoformat()}
+        return {
+            "id": pet_id,
+            "household_id": state["household_id"],
+            "name": state["name"],
+            "species_id": 1,
+            "tag_id": pet_id,
+            "photo": {"location": None},
+            "updated_at": state["since"].isoformat(),
+            "position": position,
+            "status": {"activity": position},
+        }
+
+
+class FakeClient:
+    """Stand-in for surepy's SureAPIClient."""
+
+    def __init__(self, account: SyntheticAccount, latency: float) -> None:
+        """Initialize."""
+        self.account = account
+        self.latency = latency
+        self.calls: dict[str, int] = {}
+
+    def count_call(self, endpoint: str) -> None:
+        """Count a call to an endpoint."""
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    async def get_token(self) -> str:
+        """Pretend to log in."""
+        self.count_call("login")
+        await asyncio.sleep(self.latency)
+        return "benchmark-token"
+
+    async def call(self, method: str, resource: str, **_: Any) -> dict[str, Any]:
+        """Answer the account and the pet positions, other calls with no data."""
+        endpoint = re.sub(r"/\d+", "/{id}", resource.split("?")[0].split("/api/")[-1])
+        self.count_call(endpoint)
+        await asyncio.sleep(self.latency)
+        if endpoint == "me/start":
+            return {"data": self.account.build()}
+        if endpoint == "pet":
+            return {"data": self.account.positions()}
+        return {"data": []}
+
+    async def set_lock_state(self, device_id: int, state: int) -> dict[str, Any]:
+        """Change the lock state of a flap."""
+        self.count_call("control")
+        await asyncio.sleep(self.latency)
+        self.account.device_state[device_id]["locking"] = state
+        self.account.device_state[device_id]["since"] = self.account.now
+        return {"data": {"locking": state}}
+
+    async def set_pet_location(self, pet_id: int, location: int) -> dict[str, Any]:
+        """Change the location of a pet."""
+        self.count_call("position")
+        await asyncio.sleep(self.latency)
+        self.account.pet_state[pet_id]["where"] = location
+        self.account.pet_state[pet_id]["since"] = self.account.now
+        return {"data": {"where": location}}
+
+
+class FakeSurepy:
+    """Stand-in for surepy.Surepy, created by the integration like the real one."""
+
+    # Set by the benchmark before the integration creates its client
+    account: SyntheticAccount
+    latency: float = 0.0
+
+    def __init__(self, email: str, password: str, **_: Any) -> None:
+        """Initialize."""
+        self.sac = FakeClient(self.account, self.latency)
+
@@ -0,0 +1,336 @@
+"""Benchmark the Sure Petcare integration against synthetic accounts.
+
+Run from the repository root, with the packages of benchmarks/requirements.txt
+installed:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare results.json
+    python -m benchmarks.run --simulator --latency 0.05
+
+With --simulator the real surepy client talks HTTP to the local simulator
+instead of the in-process fake. The integration polls through sac.call,
+which surepy 0.9.0 has; the command benchmarks need the fake's
+set_lock_state and only run without --simulator.
+
+Results are written as JSON, one record per benchmark and account shape.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+import gc
+import json
+from pathlib import Path
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant import loader
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from .fake_api import AccountShape, FakeSurepy, SyntheticAccount
+from .simulator import Faults, Simulator, patch_integration
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+# pylint: disable=wrong-import-position
+from custom_components.surepetcare_ha.const import (  # noqa: E402
+    COMMAND_LOCK,
+    CONF_HOUSEHOLD_ID,
+    DATA_ACCOUNTS,
+    DOMAIN,
+)
+from custom_components.surepetcare_ha.models import (  # noqa: E402
+    Command,
+    split_by_household,
+)
+
+EMAIL = "benchmark@example.com"
+
+DEFAULT_SHAPES = [
+    AccountShape(households=1, pets_per_household=4, devices_per_household=4),
+    AccountShape(households=6, pets_per_household=10, devices_per_household=8),
+    AccountShape(households=20, pets_per_household=50, devices_per_household=20),
+    AccountShape(households=50, pets_per_household=60, devices_per_household=40),
+]
+
+
+class Benchmark:
+    """Run the benchmarks for one account shape inside a test Home Assistant."""
+
+    def __init__(
+        self, shape: AccountShape, latency: float, memory: bool, simulator: bool
+    ) -> None:
+        """Initialize."""
+        self.shape = shape
+        self.latency = latency
+        self.memory = memory
+        self.account = SyntheticAccount(shape)
+        self.simulator = (
+            Simulator(self.account, Faults(latency=latency)) if simulator else None
+        )
+        self.results: list[dict[str, Any]] = []
+        self.state_writes = 0
+
+    async def _measure(
+        self, name: str, func: Callable[[], Awaitable[dict[str, Any] | None]]
+    ) -> None:
+        """Time a step and record its result."""
+        gc.collect()
+        writes_before = self.state_writes
+        if self.memory:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        extra = await func()
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if self.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        self.results.append(
+            {
+                "benchmark": name,
+                "households": self.shape.households,
+                "pets": self.shape.pets,
+                "devices": self.shape.devices,
+                "seconds": seconds,
+                "peak_kib": peak / 1024 if peak is not None else None,
+                "state_writes": self.state_writes - writes_before,
+                **(extra or {}),
+            }
+        )
+
+    async def _projection_memory(self) -> dict[str, Any]:
+        """Measure the memory of a fetch before and after its projection."""
+        # --memory already traces the whole step
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+
+        raw = self.account.build()
+        raw_bytes = tracemalloc.get_traced_memory()[0] - base
+        households = split_by_household(raw)
+        del raw
+        gc.collect()
+        projected_bytes = tracemalloc.get_traced_memory()[0] - base
+
+        if not tracing:
+            tracemalloc.stop()
+
+        entities = max(self.shape.pets + self.shape.devices, 1)
+        return {
+            "households_kept": len(households),
+            "raw_bytes_per_entity": raw_bytes / entities,
+            "projected_bytes_per_entity": projected_bytes / entities,
+        }
+
+    async def async_run(self) -> list[dict[str, Any]]:
+        """Run all benchmarks for the shape."""
+        await self._measure("projection_memory", self._projection_memory)
+
+        FakeSurepy.account = self.account
+        FakeSurepy.latency = self.latency
+
+        async with async_test_home_assistant() as hass:
+            hass.config.config_dir = str(REPO_ROOT)
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+
+            def _count_write(_event: Any) -> None:
+                self.state_writes += 1
+
+            hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+
+            if self.simulator is not None:
+                base_url = await self.simulator.async_start()
+                try:
+                    with patch_integration(base_url):
+                        await self._async_run(hass)
+                finally:
+                    await self.simulator.async_stop()
+            else:
+                with patch("custom_components.surepetcare_ha.account.Surepy", FakeSurepy):
+                    await self._async_run(hass)
+
+            await hass.async_stop(force=True)
+
+        return self.results
+
+    async def _async_run(self, hass: HomeAssistant) -> None:
+        """Run the benchmarks against a set up Home Assistant."""
+        entries = []
+        for household_id in self.account.household_ids:
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                unique_id=str(household_id),
+                data={
+                    CONF_EMAIL: EMAIL,
+                    CONF_PASSWORD: "benchmark",
+                    CONF_HOUSEHOLD_ID: household_id,
+                },
+            )
+            entry.add_to_hass(hass)
+            entries.append(entry)
+
+        async def _setup() -> dict[str, Any]:
+            for entry in entries:
+                await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            return {"entities": len(hass.states.async_entity_ids())}
+
+        await self._measure("entry_setup", _setup)
+
+        poller = hass.data[DATA_ACCOUNTS][EMAIL]
+        coordinators = [hass.data[DOMAIN][entry.entry_id] for entry in entries]
+
+        # HTTP calls are traced by the integration, the fake client counts its own
+        calls = poller.metrics.api_calls if self.simulator else poller.api.sac.calls
+
+        async def _update() -> dict[str, Any]:
+            if self.simulator is not None:
+                self.simulator.advance()
+            else:
+                self.account.advance()
+            calls_before = dict(calls)
+            await poller.async_refresh()
+            await hass.async_block_till_done()
+            return {
+                "api_calls": {
+                    endpoint: count - calls_before.get(endpoint, 0)
+                    for endpoint, count in calls.items()
+                    if count != calls_before.get(endpoint, 0)
+                }
+            }
+
+        await self._measure("update_cycle", _update)
+
+        async def _update_full() -> dict[str, Any]:
+            poller.request_full_poll()
+            return await _update()
+
+        await self._measure("update_cycle_full", _update_full)
+
+        async def _update_unchanged() -> None:
+            await poller.async_refresh()
+            await hass.async_block_till_done()
+
+        await self._measure("update_cycle_unchanged", _update_unchanged)
+
+        async def _state_writes() -> dict[str, Any]:
+            for coordinator in coordinators:
+                # No changed set, so every entity writes its state
+                coordinator.async_update_listeners()
+            await hass.async_block_till_done()
+            contexts = sum(len(coordinator.async_contexts()) for coordinator in coordinators)
+            return {"contexts": contexts}
+
+        await self._measure("state_write_all", _state_writes)
+
+        coordinator = coordinators[0]
+        # surepy 0.9.0 has no set_lock_state, so commands only run on the fake
+        flaps = coordinator.data.locking_devices if self.simulator is None else []
+
+        async def _command() -> None:
+            await coordinator.async_run_commands([Command(COMMAND_LOCK, flaps[0], 3)])
+
+        if flaps:
+            await self._measure("command_single", _command)
+
+        async def _command_burst() -> dict[str, Any]:
+            results = await coordinator.async_run_commands(
+                [Command(COMMAND_LOCK, device_id, 0) for device_id in flaps]
+            )
+            return {"commands": len(results)}
+
+        if flaps:
+            await self._measure("command_burst", _command_burst)
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+def _compare(results: list[dict[str, Any]], baseline_path: Path) -> None:
+    """Print the change against a previous result file."""
+    baseline = {
+        (result["benchmark"], result["households"], result["pets"], result["devices"]): result
+        for result in json.loads(baseline_path.read_text())["results"]
+    }
+    for result in results:
+        key = (result["benchmark"], result["households"], result["pets"], result["devices"])
+        if (previous := baseline.get(key)) is None or not previous["seconds"]:
+            continue
+        print(
+            f"{result['benchmark']:<24} households={result['households']:<3} "
+            f"{previous['seconds'] * 1000:10.2f} ms -> {result['seconds'] * 1000:10.2f} ms "
+            f"({result['seconds'] / previous['seconds']:.2f}x)"
+        )
+
+
+async def async_main(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the benchmarks for every shape."""
+    shapes = DEFAULT_SHAPES
+    if args.households:
+        shapes = [
+            AccountShape(households, args.pets, args.devices) for households in args.households
+        ]
+
+    results: list[dict[str, Any]] = []
+    for shape in shapes:
+        results += await Benchmark(
+            shape, args.latency, args.memory, args.simulator
+        ).async_run()
+
+    manifest = json.loads(
+        (REPO_ROOT / "custom_components" / DOMAIN / "manifest.json").read_text()
+    )
+    return {
+        "version": manifest["version"],
+        "python": platform.python_version(),
+        "latency": args.latency,
+        "simulator": args.simulator,
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--households", type=int, nargs="*", help="household counts to run")
+    parser.add_argument("--pets", type=int, default=20, help="pets per household")
+    parser.add_argument("--devices", type=int, default=10, help="devices per household")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake API latency (s)")
+    parser.add_argument("--memory", action="store_true", help="trace peak memory")
+    parser.add_argument(
+        "--simulator", action="store_true", help="use the HTTP simulator and the real client"
+    )
+    parser.add_argument("--output", type=Path, help="write results to this file")
+    parser.add_argument("--compare", type=Path, help="compare with a previous result file")
+    args = parser.parse_args()
+
+    report = asyncio.run(async_main(args))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        _compare(report["results"], args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""Local stand-in for the Sure Petcare cloud API.
+
+Serves the endpoints surepy 0.9.0 calls, backed by a SyntheticAccount, with
+injectable latency, server errors, 429s and token expiry. Run it on its own:
+
+    python -m benchmarks.simulator --households 5 --pets 20 --devices 10 \\
+        --latency 0.2 --error-rate 0.05 --rate-limit-rate 0.02 --token-ttl 600
+
+or start it in-process with Simulator.async_start() and point the integration
+at it with patch_integration().
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import json
+import random
+import secrets
+import time
+from typing import Any
+from unittest.mock import patch
+
+from aiohttp import ClientSession, web
+from yarl import URL
+
+from .fake_api import CAT_FLAP, PET_FLAP, AccountShape, SyntheticAccount
+
+# Host surepy sends every request to
+API_HOST = "app.api.surehub.io"
+
+# surepy only accepts stored tokens of this length
+TOKEN_LENGTH = 384
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@dataclass
+class Faults:
+    """Faults injected into the responses."""
+
+    # Seconds added to every request
+    latency: float = 0.0
+    # Share of requests answered with a 500
+    error_rate: float = 0.0
+    # Share of requests answered with a 429, and the Retry-After sent with it
+    rate_limit_rate: float = 0.0
+    retry_after: int = 5
+    # Seconds a token stays valid, 0 never expires
+    token_ttl: float = 0.0
+    seed: int = 0
+
+
+class Simulator:
+    """aiohttp application serving a synthetic Sure Petcare account."""
+
+    def __init__(self, account: SyntheticAccount, faults: Faults) -> None:
+        """Initialize."""
+        self.account = account
+        self.faults = faults
+        self._random = random.Random(faults.seed)
+        # Token: time it was issued
+        self.tokens: dict[str, float] = {}
+        self.requests: dict[str, int] = {}
+        self._timeline: dict[int, list[dict[str, Any]]] = {}
+        self._event_id = 0
+        self._runner: web.AppRunner | None = None
+        self.base_url: URL | None = None
+
+        self.app = web.Application(middlewares=[self._faults_middleware])
+        self.app.router.add_route("OPTIONS", "/{tail:.*}", self._options)
+        self.app.router.add_post("/api/auth/login", self._login)
+        self.app.router.add_get("/api/me/start", self._start)
+        self.app.router.add_get("/api/household", self._households)
+        self.app.router.add_get("/api/pet", self._pets)
+        self.app.router.add_get("/api/device", self._devices)
+        self.app.router.add_get("/api/timeline/household/{household_id}", self._timeline_page)
+        self.app.router.add_get("/api/report/household/{household_id}", self._report)
+        self.app.router.add_put("/api/device/{device_id}/control", self._control)
+        self.app.router.add_post("/api/pet/{pet_id}/position", self._position)
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> URL:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = URL.build(scheme="http", host=host, port=bound_port)
+        return self.base_url
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def advance(self) -> None:
+        """Move the account on and record the changes in the timeline."""
+        before = {pet_id: state["where"] for pet_id, state in self.account.pet_state.items()}
+        self.account.advance()
+        for pet_id, state in self.account.pet_state.items():
+            if state["where"] != before[pet_id]:
+                self._add_event(
+                    state["household_id"],
+                    {"type": 0, "pets": [{"id": pet_id}], "movements": [{"direction": state["where"]}]},
+                )
+
+    @web.middleware
+    async def _faults_middleware(self, request: web.Request, handler: Handler) -> web.StreamResponse:
+        """Count the request and inject the configured faults."""
+        resource = request.match_info.route.resource
+        name = f"{request.method} {resource.canonical if resource else request.path}"
+        self.requests[name] = self.requests.get(name, 0) + 1
+
+        if self.faults.latency:
+            await asyncio.sleep(self.faults.latency)
+        if request.method == "OPTIONS":
+            return await handler(request)
+        if self._random.random() < self.faults.rate_limit_rate:
+            return web.json_response(
+                {"error": "Too Many Requests"},
+                status=429,
+                headers={"Retry-After": str(self.faults.retry_after)},
+            )
+        if self._random.random() < self.faults.error_rate:
+            return web.json_response({"error": "Internal Server Error"}, status=500)
+        if request.path != "/api/auth/login" and not self._authorized(request):
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        return await handler(request)
+
+    def _authorized(self, request: web.Request) -> bool:
+        """Return True if the request carries a valid token."""
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if (issued := self.tokens.get(token)) is None:
+            return False
+        if self.faults.token_ttl and time.monotonic() - issued > self.faults.token_ttl:
+            del self.tokens[token]
+            return False
+        return True
+
+    async def _options(self, _request: web.Request) -> web.Response:
+        """Answer the preflight surepy sends before every call."""
+        return web.Response(status=200)
+
+    async def _login(self, request: web.Request) -> web.Response:
+        """Issue a token for any credentials."""
+        body = await request.json()
+        if not body.get("email_address") or not body.get("password"):
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        token = secrets.token_urlsafe(TOKEN_LENGTH)[:TOKEN_LENGTH]
+        self.tokens[token] = time.monotonic()
+        return web.json_response({"data": {"token": token, "user": {"id": 1}}})
+
+    async def _start(self, request: web.Request) -> web.Response:
+        """Return the whole account, with ETag support."""
+        return self._json_with_etag(
+            request,
+            {"data": self.account.build()},
+        )
+
+    async def _households(self, request: web.Request) -> web.Response:
+        """Return the households of the account."""
+        return self._json_with_etag(request, {"data": self.account.households()})
+
+    async def _pets(self, request: web.Request) -> web.Response:
+        """Return the pets of the account."""
+        return self._json_with_etag(
+            request, {"data": [self.account.pet(pet_id) for pet_id in self.account.pet_state]}
+        )
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        """Return the devices of the account."""
+        return self._json_with_etag(
+            request,
+            {"data": [self.account.device(device_id) for device_id in self.account.device_state]},
+        )
+
+    async def _timeline_page(self, request: web.Request) -> web.Response:
+        """Return a page of a household timeline, newest first."""
+        household_id = int(request.match_info["household_id"])
+        page = int(request.query.get("page", 1))
+        page_size = int(request.query.get("page_size", 25))
+        since_id = int(request.query.get("since_id", 0))
+
+        events = [
+            event for event in reversed(self._timeline.get(household_id, []))
+            if event["id"] > since_id
+        ]
+        start = (page - 1) * page_size
+        return web.json_response({"data": events[start:start + page_size]})
+
+    async def _report(self, _request: web.Request) -> web.Response:
+        """Return an empty household report."""
+        return web.json_response({"data": []})
+
+    async def _control(self, request: web.Request) -> web.Response:
+        """Change the lock state or curfew of a flap."""
+        device_id = int(request.match_info["device_id"])
+        if (state := self.account.device_state.get(device_id)) is None:
+            return web.json_response({"error": "Not Found"}, status=404)
+
+        body = await request.json()
+        if "locking" in body:
+            if state["product_id"] not in (PET_FLAP, CAT_FLAP):
+                return web.json_response({"error": "Unprocessable"}, status=422)
+            state["locking"] = int(body["locking"])
+            state["since"] = self.account.now
+        if "curfew" in body:
+            state["curfew"] = body["curfew"]
+        return web.json_response({"data": {**self.account.control(state), **body}})
+
+    async def _position(self, request: web.Request) -> web.Response:
+        """Change the location of a pet."""
+        pet_id = int(request.match_info["pet_id"])
+        if (state := self.account.pet_state.get(pet_id)) is None:
+            return web.json_response({"error": "Not Found"}, status=404)
+
+        body = await request.json()
+        state["where"] = int(body["where"])
+        state["since"] = datetime.fromisoformat(body["since"]) if "since" in body else state["since"]
+        self._add_event(
+            state["household_id"],
+            {"type": 0, "pets": [{"id": pet_id}], "movements": [{"direction": state["where"]}]},
+        )
+        return web.json_response({"data": {"where": state["where"], "since": body.get("since")}})
+
+    def _json_with_etag(self, request: web.Request, payload: dict[str, Any]) -> web.Response:
+        """Answer 304 when the client already has this payload."""
+        body = json.dumps(payload, default=str)
+        etag = hashlib.sha1(body.encode()).hexdigest()
+        # surepy sends the stored ETag in an "Etag" request header
+        if request.headers.get("Etag", "").strip('"') == etag:
+            return web.Response(status=304, headers={"ETag": f'"{etag}"'})
+        return web.Response(
+            text=body, content_type="application/json", headers={"ETag": f'"{etag}"'}
+        )
+
+    def _add_event(self, household_id: int, event: dict[str, Any]) -> None:
+        """Append an event to a household timeline."""
+        self._event_id += 1
+        self._timeline.setdefault(household_id, []).append(
+            {"id": self._event_id, "created_at": datetime.now(timezone.utc).isoformat(), **event}
+        )
+
+
+class SimulatorSession(ClientSession):
+    """ClientSession that sends requests for the Sure Petcare cloud to a simulator."""
+
+    def __init__(self, base_url: URL, **kwargs: Any) -> None:
+        """Initialize."""
+        super().__init__(**kwargs)
+        self._simulator_url = base_url
+
+    def _request(self, method: str, str_or_url: Any, **kwargs: Any) -> Any:
+        """Rewrite the host of cloud API requests."""
+        url = URL(str_or_url)
+        if url.host == API_HOST:
+            url = url.with_scheme(self._simulator_url.scheme).with_host(
+                self._simulator_url.host
+            ).with_port(self._simulator_url.port)
+            # surepy sends the cloud host in an explicit Host header
+            if (headers := kwargs.get("headers")) is not None:
+                headers = dict(headers)
+                headers.pop("Host", None)
+                kwargs["headers"] = headers
+        return super()._request(method, url, **kwargs)
+
+
+@contextmanager
+def patch_integration(base_url: URL) -> Iterator[None]:
+    """Point the integration's API sessions at a running simulator."""
+
+    def _account_session(_hass: Any, **kwargs: Any) -> SimulatorSession:
+        return SimulatorSession(base_url, **kwargs)
+
+    def _shared_session(_hass: Any, *_args: Any, **_kwargs: Any) -> SimulatorSession:
+        return SimulatorSession(base_url)
+
+    with patch(
+        "custom_components.surepetcare_ha.account.async_create_clientsession",
+        _account_session,
+    ), patch(
+        "custom_components.surepetcare_ha.config_flow.async_get_clientsession",
+        _shared_session,
+    ):
+        yield
+
+
+async def _async_serve(args: argparse.Namespace) -> None:
+    """Serve until interrupted, moving the account on every interval."""
+    simulator = Simulator(
+        SyntheticAccount(
+            AccountShape(args.households, args.pets, args.devices, churn=args.churn)
+        ),
+        Faults(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=args.retry_after,
+            token_ttl=args.token_ttl,
+        ),
+    )
+    base_url = await simulator.async_start(args.host, args.port)
+    print(f"Sure Petcare simulator listening on {base_url}")
+    try:
+        while True:
+            await asyncio.sleep(args.advance)
+            simulator.advance()
+    finally:
+        await simulator.async_stop()
+        print(json.dumps(simulator.requests, indent=2))
+
+
+def main() -> None:
+    """Parse arguments and serve."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--households", type=int, default=1)
+    parser.add_argument("--pets", type=int, default=4, help="pets per household")
+    parser.add_argument("--devices", type=int, default=4, help="devices per household")
+    parser.add_argument("--churn", type=float, default=0.05, help="share changed per advance")
+    parser.add_argument("--advance", type=float, default=60.0, help="seconds between changes")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429s")
+    parser.add_argument("--retry-after", type=int, default=5, help="Retry-After of 429s")
+    parser.add_argument("--token-ttl", type=float, default=0.0, help="token lifetime (s)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_async_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,259 @@
 """The Sure Petcare integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
+from typing import Any
 
-from surepy import Surepy
-from surepy.exceptions import SurePetcareAuthenticationError, SurePetcareConnectionError
+from surepy.exceptions import SurePetcareError
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+import homeassistant.helpers.config_validation as cv
 
-from .const import CONF_HOUSEHOLD_ID, DEFAULT_POLLING_INTERVAL, DOMAIN, PLATFORMS
+from .account import async_get_account, async_release_account
+from .activity import PetActivityTracker, async_remove_activity
+from .const import COMMAND_PET_LOCATION, CONF_HOUSEHOLD_ID, DATA_PETS, DOMAIN, PLATFORMS
+from .consumption import ConsumptionTracker, async_remove_consumption
 from .coordinator import SurePetcareDataUpdateCoordinator
+from .models import Command, CurfewRecord
+from .storage import SnapshotStore
+from .timeline import TimelineIngester, async_remove_timeline
 
 _LOGGER = logging.getLogger(__name__)
 
+SET_PET_LOCATION_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional("pet_id"): vol.All(cv.ensure_list, [vol.Coerce(int)]),
+            vol.Optional("household_id"): vol.Coerce(int),
+            vol.Required("location"): vol.All(vol.Coerce(int), vol.In([1, 2])),
+        }
+    ),
+    cv.has_at_least_one_key("pet_id", "household_id"),
+)
+
+SET_HOUSEHOLD_LOCK_MODE_SCHEMA = vol.Schema(
+    {
+        vol.Required("household_id"): vol.Coerce(int),
+        vol.Required("lock_mode"): vol.All(vol.Coerce(int), vol.In([0, 1, 2, 3])),
+    }
+)
+
+SET_CURFEW_SCHEMA = vol.Schema(
+    {
+        vol.Required("device_id"): vol.Coerce(int),
+        vol.Required("lock_time"): cv.time,
+        vol.Required("unlock_time"): cv.time,
+        vol.Optional("enabled", default=True): cv.boolean,
+    }
+)
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Sure Petcare from a config entry."""
-    
-    email = entry.data[CONF_EMAIL]
-    password = entry.data[CONF_PASSWORD]
     household_id = entry.data[CONF_HOUSEHOLD_ID]
 
-    session = async_get_clientsession(hass)
-    surepy = Surepy(
-        email,
-        password,
-        auth_token=None,
-        api_timeout=10,
-        session=session,
-    )
-
-    coordinator = SurePetcareDataUpdateCoordinator(
-        hass,
-        surepy,
-        household_id,
-        DEFAULT_POLLING_INTERVAL,
-    )
-
-    # Fetch initial data
-    await coordinator.async_config_entry_first_refresh()
+    # All entries of the same login share one client and one poll
+    account = async_get_account(hass, entry)
+
+    try:
+        snapshot_store = SnapshotStore(hass, entry.entry_id)
+        timeline = TimelineIngester(
+            hass, account.api, account.limiter, household_id, entry.entry_id
+        )
+        await timeline.async_load()
+        consumption = ConsumptionTracker(hass, entry.entry_id)
+        await consumption.async_load()
+        activity = PetActivityTracker(hass, entry.entry_id)
+        await activity.async_load()
+
+        coordinator = SurePetcareDataUpdateCoordinator(
+            hass,
+            entry.entry_id,
+            account,
+            household_id,
+            snapshot_store,
+            timeline,
+            consumption,
+            activity,
+        )
+
+        snapshot = await snapshot_store.async_load()
+        if account.data is None and snapshot:
+            # Start from the last known state and fetch live data in the background
+            coordinator.async_restore(snapshot)
+            coordinator.async_attach()
+            entry.async_create_background_task(
+                hass, account.async_request_refresh(), f"{DOMAIN}_initial_refresh"
+            )
+        else:
+            if snapshot:
+                # Only report batteries that went low since the view was stored
+                coordinator.async_seed_battery_levels(snapshot)
+            # Fetch initial data
+            await coordinator.async_config_entry_first_refresh()
+            coordinator.async_attach()
+    except Exception:
+        await async_release_account(hass, entry)
+        raise
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    async def handle_set_pet_location(call) -> None:
+    async def handle_set_pet_location(call: ServiceCall) -> ServiceResponse:
         """Handle the service call."""
-        pet_id = call.data["pet_id"]
-        location_id = int(call.data["location"])
-
-        # Find the coordinator that has this pet
-        for coord in hass.data[DOMAIN].values():
-            if pet_id in coord.data.pets:
-                try:
-                    await coord.api.sac.set_pet_location(pet_id, location_id)
-                    await coord.async_request_refresh()
-                    return
-                except Exception as err:
-                    _LOGGER.error("Error setting pet location via service: %s", err)
+        location_id = call.data["location"]
+        pet_ids: list[int] = list(call.data.get("pet_id", []))
+        response: dict[str, Any] = {}
+        if (household_id := call.data.get("household_id")) is not None:
+            for coord in hass.data[DOMAIN].values():
+                if coord.household_id == household_id:
+                    pet_ids.extend(coord.data.pets)
                     break
+            else:
+                _LOGGER.error("No household %s found", household_id)
+                response["error"] = f"Unknown household {household_id}"
+
+        # Group the pets by the coordinator of their household
+        index: dict[int, SurePetcareDataUpdateCoordinator] = hass.data.get(DATA_PETS, {})
+        commands: dict[SurePetcareDataUpdateCoordinator, list[Command]] = {}
+        results: dict[int, dict[str, Any]] = {}
+        for pet_id in dict.fromkeys(pet_ids):
+            if (owner := index.get(pet_id)) is None:
+                results[pet_id] = {"success": False, "error": "Unknown pet"}
+                continue
+            commands.setdefault(owner, []).append(
+                Command(COMMAND_PET_LOCATION, pet_id, location_id)
+            )
+
+        # Each account sends its commands concurrently and refreshes once
+        for batch in await asyncio.gather(
+            *(owner.async_run_commands(batch) for owner, batch in commands.items())
+        ):
+            for result in batch:
+                results[result.command.target_id] = {
+                    "success": result.success,
+                    "error": result.error,
+                }
+
+        for pet_id, result in results.items():
+            if not result["success"]:
+                _LOGGER.error(
+                    "Error setting location of pet %s via service: %s",
+                    pet_id,
+                    result["error"],
+                )
+
+        response["results"] = [
+            {"pet_id": pet_id, **result} for pet_id, result in results.items()
+        ]
+        return response
 
     if not hass.services.has_service(DOMAIN, "set_pet_location"):
-        hass.services.async_register(DOMAIN, "set_pet_location", handle_set_pet_location)
+        hass.services.async_register(
+            DOMAIN,
+            "set_pet_location",
+            handle_set_pet_location,
+            schema=SET_PET_LOCATION_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async def handle_set_household_lock_mode(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call."""
+        household_id = call.data["household_id"]
+
+        for coord in hass.data[DOMAIN].values():
+            if coord.household_id != household_id:
+                continue
+            # All flaps are set concurrently, followed by a single refresh
+            results = await coord.async_set_lock_mode(call.data["lock_mode"])
+            for result in results:
+                if not result.success:
+                    _LOGGER.error(
+                        "Error setting lock mode of device %s via service: %s",
+                        result.command.target_id,
+                        result.error,
+                    )
+            return {
+                "results": [
+                    {
+                        "device_id": result.command.target_id,
+                        "success": result.success,
+                        "skipped": result.skipped,
+                        "error": result.error,
+                    }
+                    for result in results
+                ]
+            }
+
+        _LOGGER.error("No household %s found", household_id)
+        return {"results": []}
+
+    if not hass.services.has_service(DOMAIN, "set_household_lock_mode"):
+        hass.services.async_register(
+            DOMAIN,
+            "set_household_lock_mode",
+            handle_set_household_lock_mode,
+            schema=SET_HOUSEHOLD_LOCK_MODE_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+    async def handle_set_curfew(call) -> None:
+        """Handle the service call."""
+        device_id = call.data["device_id"]
+        curfew = CurfewRecord(
+            call.data["enabled"],
+            call.data["lock_time"],
+            call.data["unlock_time"],
+        )
+
+        # Find the coordinator of the household that has this flap
+        for coord in hass.data[DOMAIN].values():
+            if device_id not in coord.data.curfew_devices:
+                continue
+            try:
+                await coord.async_set_curfew(device_id, [curfew])
+            except SurePetcareError as err:
+                _LOGGER.error("Error setting curfew via service: %s", err)
+            return
+
+        _LOGGER.error("No flap with curfews found for device %s", device_id)
+
+    if not hass.services.has_service(DOMAIN, "set_curfew"):
+        hass.services.async_register(
+            DOMAIN, "set_curfew", handle_set_curfew, schema=SET_CURFEW_SCHEMA
+        )
+
+    try:
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.async_detach()
+        await async_release_account(hass, entry)
+        raise
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the shared account poller."""
+    coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.account.apply_options()
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data of a deleted entry."""
+    await SnapshotStore(hass, entry.entry_id).async_remove()
+    await async_remove_timeline(hass, entry.entry_id)
+    await async_remove_consumption(hass, entry.entry_id)
+    await async_remove_activity(hass, entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.async_detach()
+        await async_release_account(hass, entry)
 
     return unload_ok
@@ -0,0 +1,513 @@
+"""Account-level polling shared by all Sure Petcare config entries."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import timedelta
+import hashlib
+from http import HTTPStatus
+import json
+import time
+from typing import Any
+
+from aiohttp import ClientSession
+from surepy import Surepy
+from surepy.const import BASE_RESOURCE, MESTART_RESOURCE
+from surepy.exceptions import SurePetcareAuthenticationError, SurePetcareError
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_TOKEN
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    COMMAND_CONCURRENCY,
+    COMMAND_SETTLE_DELAY,
+    CONF_FULL_POLL_INTERVAL,
+    CONF_POLL_CEILING,
+    CONF_POLL_DECAY,
+    CONF_POLL_FLOOR,
+    DATA_ACCOUNTS,
+    DEFAULT_FULL_POLL_INTERVAL,
+    DEFAULT_POLL_CEILING,
+    DEFAULT_POLL_DECAY,
+    DEFAULT_POLL_FLOOR,
+    DEFAULT_POLLING_INTERVAL,
+    DEFAULT_RETRY_AFTER,
+    DOMAIN,
+    LOGGER,
+    MAX_RETRY_AFTER,
+    POLL_BOOST_WINDOW,
+    RATE_LIMIT_RETRIES,
+    REQUEST_BURST,
+    REQUEST_RATE,
+)
+from .dispatcher import CommandDispatcher
+from .metrics import PollMetrics
+from .models import HouseholdData, merge_positions, split_by_household
+from .ratelimit import (
+    PRIORITY_POLL,
+    RequestLimiter,
+    SurePetcareRateLimitedError,
+    last_response_status,
+)
+from .scheduler import AdaptivePollScheduler
+from .timeline import TimelineIngester
+
+# Only the position of every pet, a fraction of the whole account
+POSITION_RESOURCE = "{base}/pet?with%5B%5D=position"
+
+
+class SurePetcareAccount(DataUpdateCoordinator[dict[int, HouseholdData]]):
+    """Poll the Sure Petcare API once per interval for a whole account.
+
+    Every household coordinator of the same login listens to this poller and
+    receives its own slice of the result.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: Surepy,
+        session: ClientSession,
+        email: str,
+        token: str | None,
+        update_interval: timedelta,
+        metrics: PollMetrics,
+        limiter: RequestLimiter,
+    ) -> None:
+        """Initialize."""
+        # Identifies the account in names and unique IDs without the email
+        self.account_id = hashlib.sha256(email.encode()).hexdigest()[:16]
+        super().__init__(
+            hass,
+            LOGGER,
+            name=f"{DOMAIN}_{self.account_id}",
+            update_interval=update_interval,
+        )
+        self.api = api
+        # Owned by the account, closed on shutdown
+        self.session = session
+        self.token = token
+        # Bumped on every login, so a rejected token is only replaced once
+        self._token_generation = 0
+        self._login_lock = asyncio.Lock()
+        self.entry_ids: set[str] = set()
+        # Sensor platforms that can add the polling metrics, by entry, and the
+        # entry whose platform currently shows them
+        self._metrics_platforms: dict[str, Callable[[], None]] = {}
+        self.metrics_entry_id: str | None = None
+        self.metrics = metrics
+        self.limiter = limiter
+        # Timeline followers of the attached households
+        self.timelines: dict[int, TimelineIngester] = {}
+        # Sequence number of the last acknowledged command, and the value it
+        # had when the fetch that produced the current data was started
+        self.command_seq = 0
+        self.data_seq = 0
+        # When the last full poll ran and the command sequence it covered
+        self._last_full_poll: float | None = None
+        self._full_seq = 0
+        self._full_requested = False
+        self.full_poll_interval = DEFAULT_FULL_POLL_INTERVAL
+        # Fingerprint of the last response per tier, and whether the last poll matched
+        self._fingerprints: dict[bool, str] = {}
+        self.unchanged = False
+        # Time the running poll spent in synchronous code on the event loop
+        self._loop_time: float | None = None
+        self.scheduler = AdaptivePollScheduler(
+            update_interval,
+            DEFAULT_POLL_FLOOR,
+            DEFAULT_POLL_CEILING,
+            DEFAULT_POLL_DECAY,
+            POLL_BOOST_WINDOW,
+        )
+        self.dispatcher = CommandDispatcher(
+            hass,
+            api,
+            limiter,
+            self.async_request_refresh,
+            COMMAND_CONCURRENCY,
+            COMMAND_SETTLE_DELAY,
+        )
+
+    async def async_shutdown(self) -> None:
+        """Cancel scheduled work and stop polling."""
+        self.dispatcher.async_shutdown()
+        await super().async_shutdown()
+        await self.session.close()
+
+    async def _async_update_data(self) -> dict[int, HouseholdData]:
+        """Fetch the account or the pet positions and split them by household."""
+        self._loop_time = None
+        fetch_seq = self.command_seq
+        full = self._full_poll_due()
+        fetch = self._async_fetch_start if full else self._async_fetch_positions
+        self.unchanged = False
+        metrics = self.metrics
+        metrics.polls += 1
+        bytes_before = metrics.bytes_received
+        start = time.monotonic()
+        try:
+            generation = self._token_generation
+            if self.token is None:
+                await self._async_login(generation)
+                generation = self._token_generation
+            try:
+                data = await self.limiter.async_call(PRIORITY_POLL, fetch)
+            except SurePetcareAuthenticationError:
+                # The stored token was rejected, log in again and retry once
+                metrics.retries += 1
+                await self._async_login(generation)
+                data = await self.limiter.async_call(PRIORITY_POLL, fetch)
+        except SurePetcareRateLimitedError as err:
+            metrics.errors += 1
+            metrics.api_time.record(time.monotonic() - start)
+            if self.data is None:
+                raise UpdateFailed(f"Error communicating with API: {err}") from err
+            # Keep the last data and try again once the pause is over
+            LOGGER.warning("Sure Petcare poll skipped: %s", err)
+            for household in self.data.values():
+                household.new_events = []
+            self.update_interval = timedelta(
+                seconds=max(self.limiter.paused_for, self.scheduler.floor)
+            )
+            return self.data
+        except SurePetcareError as err:
+            metrics.errors += 1
+            metrics.api_time.record(time.monotonic() - start)
+            self.update_interval = self.scheduler.failure()
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        api_time = time.monotonic() - start
+
+        if full:
+            metrics.full_polls += 1
+            self._last_full_poll = time.monotonic()
+            self._full_seq = fetch_seq
+            self._full_requested = False
+
+        if data is None:
+            # Not modified since the last poll of this tier, nothing to parse
+            fingerprint, households = None, None
+        else:
+            # Fingerprinting, parsing and building the views run in the executor
+            start = time.monotonic()
+            fingerprint, households = await self.hass.async_add_executor_job(
+                self._build_views, full, data
+            )
+            metrics.parse_time.record(time.monotonic() - start)
+
+        loop_start = time.perf_counter()
+        if fingerprint is not None:
+            self._fingerprints[full] = fingerprint
+        if households is None:
+            # Same answer as last time, nothing to split, merge or compare
+            metrics.unchanged_polls += 1
+            self.unchanged = True
+            households = self.data
+            for household in households.values():
+                household.new_events = []
+        loop_time = time.perf_counter() - loop_start
+
+        start = time.monotonic()
+        if full:
+            # Consumption only needs the timelines as often as the devices
+            await self._async_ingest_timelines(households)
+        metrics.api_time.record(api_time + time.monotonic() - start)
+
+        loop_start = time.perf_counter()
+        metrics.last_payload_bytes = metrics.bytes_received - bytes_before
+        self.data_seq = fetch_seq
+        self.update_interval = self._until_full_poll(
+            self.scheduler.success(self._pets_moved(households))
+        )
+        self._loop_time = loop_time + time.perf_counter() - loop_start
+
+        return households
+
+    def _full_poll_due(self) -> bool:
+        """Return True if the next poll must fetch the whole account."""
+        return (
+            self.data is None
+            or self._last_full_poll is None
+            or self._full_requested
+            # Commands are confirmed by the device state of a full poll
+            or self.command_seq != self._full_seq
+            or time.monotonic() - self._last_full_poll
+            >= self.full_poll_interval.total_seconds()
+        )
+
+    def _until_full_poll(self, interval: timedelta) -> timedelta:
+        """Shorten an interval so the next full poll is not run late."""
+        if self._last_full_poll is None:
+            return interval
+        remaining = (
+            self.full_poll_interval.total_seconds()
+            - (time.monotonic() - self._last_full_poll)
+        )
+        return min(interval, timedelta(seconds=max(remaining, self.scheduler.floor)))
+
+    def _build_views(
+        self, full: bool, data: Any
+    ) -> tuple[str, dict[int, HouseholdData] | None]:
+        """Fingerprint a response and build the household views from it.
+
+        Runs in the executor and only reads the previous views. The JSON is
+        fingerprinted before anything is parsed from it. Returns the
+        fingerprint, and no views if the response did not change.
+        """
+        fingerprint = hashlib.blake2b(
+            json.dumps(data, sort_keys=True).encode(), digest_size=16
+        ).hexdigest()
+        if self.data is not None and self._fingerprints.get(full) == fingerprint:
+            return fingerprint, None
+
+        if full:
+            return fingerprint, split_by_household(data)
+        return fingerprint, merge_positions(self.data, data)
+
+    def request_full_poll(self) -> None:
+        """Fetch the whole account on the next poll."""
+        self._full_requested = True
+
+    async def _async_fetch_start(self) -> dict[str, Any] | None:
+        """Fetch the whole account as JSON, None if it was not modified."""
+        response = await self.api.sac.call(method="GET", resource=MESTART_RESOURCE)
+        if response is not None:
+            return response.get("data") or {}
+        if (status := last_response_status()) == HTTPStatus.NOT_MODIFIED:
+            return None
+        raise SurePetcareError(f"Fetching the account failed with status {status}")
+
+    async def _async_fetch_positions(self) -> list[dict[str, Any]] | None:
+        """Fetch the position of every pet, None if they were not modified."""
+        response = await self.api.sac.call(
+            method="GET", resource=POSITION_RESOURCE.format(base=BASE_RESOURCE)
+        )
+        if response is not None:
+            return response.get("data") or []
+        if (status := last_response_status()) == HTTPStatus.NOT_MODIFIED:
+            return None
+        raise SurePetcareError(f"Fetching pet positions failed with status {status}")
+
+    async def _async_ingest_timelines(self, households: dict[int, HouseholdData]) -> None:
+        """Attach the new timeline events of every attached household."""
+        if not self.timelines:
+            return
+
+        ingesters = list(self.timelines.values())
+        results = await asyncio.gather(
+            *(ingester.async_update() for ingester in ingesters),
+            return_exceptions=True,
+        )
+
+        for ingester, result in zip(ingesters, results):
+            if isinstance(result, SurePetcareError):
+                self.metrics.errors += 1
+                # The cursor is kept, the next poll picks up the missed events
+                LOGGER.warning(
+                    "Error fetching timeline of household %s: %s",
+                    ingester.household_id,
+                    result,
+                )
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            if (household := households.get(ingester.household_id)) is not None:
+                household.new_events = result
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Push a poll to the households and time the fan-out."""
+        updates_before = self.metrics.entity_updates
+        start = time.perf_counter()
+        super().async_update_listeners()
+        fanout_time = time.perf_counter() - start
+        self.metrics.fanout_time.record(fanout_time)
+        if self._loop_time is not None:
+            # The merge after the executor job and the fan-out block the loop
+            self.metrics.loop_time.record(self._loop_time + fanout_time)
+            self._loop_time = None
+        self.metrics.last_entity_updates = self.metrics.entity_updates - updates_before
+
+    async def _async_login(self, generation: int) -> None:
+        """Log in with the account credentials and store the new token.
+
+        Skipped if another caller logged in since the token of the given
+        generation was used.
+        """
+        async with self._login_lock:
+            if generation != self._token_generation:
+                return
+            LOGGER.debug("Requesting a new auth token for %s", self.name)
+            self.metrics.logins += 1
+            self.token = await self.limiter.async_call(
+                PRIORITY_POLL, self.api.sac.get_token
+            )
+            self._token_generation += 1
+        self.async_store_token()
+
+    @callback
+    def async_store_token(self) -> None:
+        """Save the current token in every attached config entry."""
+        if self.token is None:
+            return
+
+        for entry_id in self.entry_ids:
+            entry = self.hass.config_entries.async_get_entry(entry_id)
+            if entry is not None and entry.data.get(CONF_TOKEN) != self.token:
+                self.hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, CONF_TOKEN: self.token}
+                )
+
+    @callback
+    def async_add_metrics_platform(
+        self, entry_id: str, add_metrics: Callable[[], None]
+    ) -> None:
+        """Register a sensor platform that can show the polling metrics."""
+        self._metrics_platforms[entry_id] = add_metrics
+        if self.metrics_entry_id is None:
+            self._async_show_metrics()
+
+    @callback
+    def async_remove_metrics_platform(self, entry_id: str) -> None:
+        """Forget the sensor platform of an entry, moving the metrics if it showed them."""
+        self._metrics_platforms.pop(entry_id, None)
+        if self.metrics_entry_id == entry_id:
+            self.metrics_entry_id = None
+            self._async_show_metrics()
+
+    @callback
+    def _async_show_metrics(self) -> None:
+        """Add the polling metrics through one of the registered platforms."""
+        if not self._metrics_platforms:
+            return
+        self.metrics_entry_id, add_metrics = next(iter(self._metrics_platforms.items()))
+        add_metrics()
+
+    def next_command_seq(self) -> int:
+        """Return the sequence number for a newly acknowledged command."""
+        self.command_seq += 1
+        return self.command_seq
+
+    def boost_polling(self) -> None:
+        """Poll faster for a while, e.g. after a command was sent."""
+        self.scheduler.boost()
+
+    def apply_options(self) -> None:
+        """Configure the scheduler from the options of all attached entries.
+
+        The most responsive setting of any entry wins.
+        """
+        floors: list[float] = []
+        ceilings: list[float] = []
+        decays: list[float] = []
+        full_intervals: list[float] = []
+
+        for entry_id in self.entry_ids:
+            if (entry := self.hass.config_entries.async_get_entry(entry_id)) is None:
+                continue
+            floors.append(
+                entry.options.get(CONF_POLL_FLOOR, DEFAULT_POLL_FLOOR.total_seconds())
+            )
+            ceilings.append(
+                entry.options.get(CONF_POLL_CEILING, DEFAULT_POLL_CEILING.total_seconds())
+            )
+            decays.append(entry.options.get(CONF_POLL_DECAY, DEFAULT_POLL_DECAY))
+            full_intervals.append(
+                entry.options.get(
+                    CONF_FULL_POLL_INTERVAL, DEFAULT_FULL_POLL_INTERVAL.total_seconds()
+                )
+            )
+
+        if not floors:
+            return
+
+        self.scheduler.configure(
+            timedelta(seconds=min(floors)),
+            timedelta(seconds=min(ceilings)),
+            min(decays),
+        )
+        self.full_poll_interval = timedelta(seconds=min(full_intervals))
+
+    def _pets_moved(self, households: dict[int, HouseholdData]) -> bool:
+        """Return True if any pet changed location since the previous poll."""
+        if not self.data:
+            return False
+
+        for household_id, household in households.items():
+            if (previous := self.data.get(household_id)) is None:
+                continue
+            for pet_id, pet in household.pets.items():
+                if (old := previous.pets.get(pet_id)) is None:
+                    continue
+                if old.location.where != pet.location.where:
+                    return True
+
+        return False
+
+
+def _account_key(entry: ConfigEntry) -> str:
+    """Return the key identifying the account of a config entry."""
+    return entry.data[CONF_EMAIL].lower()
+
+
+def async_get_account(hass: HomeAssistant, entry: ConfigEntry) -> SurePetcareAccount:
+    """Return the shared account poller for an entry, creating it if needed."""
+    accounts: dict[str, SurePetcareAccount] = hass.data.setdefault(DATA_ACCOUNTS, {})
+    key = _account_key(entry)
+
+    if (account := accounts.get(key)) is None:
+        token = entry.data.get(CONF_TOKEN)
+        metrics = PollMetrics()
+        limiter = RequestLimiter(
+            REQUEST_RATE,
+            REQUEST_BURST,
+            RATE_LIMIT_RETRIES,
+            DEFAULT_RETRY_AFTER,
+            MAX_RETRY_AFTER,
+        )
+        # Own session so its calls can be traced without touching other integrations
+        session = async_create_clientsession(
+            hass, trace_configs=[metrics.trace_config(), limiter.trace_config()]
+        )
+        surepy = Surepy(
+            entry.data[CONF_EMAIL],
+            entry.data[CONF_PASSWORD],
+            auth_token=token,
+            api_timeout=10,
+            session=session,
+        )
+        account = accounts[key] = SurePetcareAccount(
+            hass,
+            surepy,
+            session,
+            key,
+            token,
+            DEFAULT_POLLING_INTERVAL,
+            metrics,
+            limiter,
+        )
+
+    account.entry_ids.add(entry.entry_id)
+    account.apply_options()
+    account.async_store_token()
+    return account
+
+
+async def async_release_account(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Detach an entry from its account poller and stop it once unused."""
+    accounts: dict[str, SurePetcareAccount] = hass.data.get(DATA_ACCOUNTS, {})
+    key = _account_key(entry)
+
+    if (account := accounts.get(key)) is None:
+        return
+
+    account.entry_ids.discard(entry.entry_id)
+    account.async_remove_metrics_platform(entry.entry_id)
+    if not account.entry_ids:
+        accounts.pop(key)
+        await account.async_shutdown()
+    else:
+        account.apply_options()
@@ -0,0 +1,174 @@
+"""Daily time outside and trips per pet, kept as running totals."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import ACTIVITY_SAVE_DELAY, DOMAIN, LOCATION_OUTSIDE
+
+ACTIVITY_VERSION = 1
+ACTIVITY_STORAGE_KEY = DOMAIN + ".{entry_id}.activity"
+
+
+@dataclass(slots=True)
+class PetActivity:
+    """Today's outdoor totals of one pet."""
+
+    where: int
+    # Local date the totals belong to
+    day: str
+    # Start of the current trip, clipped to midnight, while outside
+    outside_since: datetime | None = None
+    # Seconds of the finished trips of today
+    outside_seconds: float = 0.0
+    trips: int = 0
+    longest_trip: float = 0.0
+
+
+class PetActivityTracker:
+    """Time outside, trips and the longest trip of today, per pet.
+
+    Every poll hands in the location of each pet. Only a change of location
+    touches the totals, so no history is ever rescanned. At midnight the
+    totals start over, a pet that is outside carries its trip into the new day
+    from midnight. The totals are checkpointed to storage.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self.pets: dict[int, PetActivity] = {}
+        self._store: Store[dict[str, Any]] = Store(
+            hass, ACTIVITY_VERSION, ACTIVITY_STORAGE_KEY.format(entry_id=entry_id)
+        )
+
+    async def async_load(self) -> None:
+        """Restore the checkpointed totals."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        for pet_id, values in stored.items():
+            if values.get("outside_since") is not None:
+                values["outside_since"] = dt_util.parse_datetime(values["outside_since"])
+            self.pets[int(pet_id)] = PetActivity(**values)
+        self.async_rollover(dt_util.now())
+
+    @callback
+    def async_observe(self, pet_id: int, where: int, since: datetime | None) -> bool:
+        """Record the location of a pet, return True if it moved."""
+        if (activity := self.pets.get(pet_id)) is not None and activity.where == where:
+            return False
+        if isinstance(since, datetime) and since.tzinfo is None:
+            since = since.replace(tzinfo=dt_util.UTC)
+
+        now = dt_util.now()
+        if not isinstance(since, datetime) or since > now:
+            since = now
+        # Trips that started yesterday only count from midnight
+        since = max(since, dt_util.start_of_local_day(now))
+        day = now.date().isoformat()
+
+        if activity is None:
+            # First sighting, nothing to count until the next transition
+            self.pets[pet_id] = PetActivity(
+                where, day, since if where == LOCATION_OUTSIDE else None
+            )
+            self._async_schedule_save()
+            return True
+
+        if activity.day != day:
+            self._rollover(activity, now)
+
+        if activity.outside_since is not None:
+            # Back inside (or unknown), the trip is over
+            trip = max((since - activity.outside_since).total_seconds(), 0.0)
+            activity.outside_seconds += trip
+            activity.longest_trip = max(activity.longest_trip, trip)
+            activity.outside_since = None
+
+        if where == LOCATION_OUTSIDE:
+            activity.trips += 1
+            activity.outside_since = since
+
+        activity.where = where
+        self._async_schedule_save()
+        return True
+
+    @callback
+    def async_rollover(self, now: datetime) -> None:
+        """Start today's totals for every pet."""
+        day = now.date().isoformat()
+        rolled = False
+        for activity in self.pets.values():
+            if activity.day != day:
+                self._rollover(activity, now)
+                rolled = True
+        if rolled:
+            self._async_schedule_save()
+
+    @staticmethod
+    def _rollover(activity: PetActivity, now: datetime) -> None:
+        """Reset the totals of a pet for the day of now."""
+        activity.day = now.date().isoformat()
+        activity.outside_seconds = 0.0
+        activity.trips = 0
+        activity.longest_trip = 0.0
+        if activity.outside_since is not None:
+            activity.outside_since = dt_util.start_of_local_day(now)
+
+    def time_outside(self, pet_id: int) -> float:
+        """Return today's seconds outside, the current trip included."""
+        if (activity := self.pets.get(pet_id)) is None:
+            return 0.0
+        return activity.outside_seconds + self._current_trip(activity)
+
+    def trips(self, pet_id: int) -> int:
+        """Return the number of trips started today."""
+        activity = self.pets.get(pet_id)
+        return activity.trips if activity is not None else 0
+
+    def longest_trip(self, pet_id: int) -> float:
+        """Return today's longest trip in seconds, the current one included."""
+        if (activity := self.pets.get(pet_id)) is None:
+            return 0.0
+        return max(activity.longest_trip, self._current_trip(activity))
+
+    def outside_pets(self) -> list[int]:
+        """Return the pets that are outside now."""
+        return [
+            pet_id
+            for pet_id, activity in self.pets.items()
+            if activity.outside_since is not None
+        ]
+
+    @staticmethod
+    def _current_trip(activity: PetActivity) -> float:
+        """Return the seconds of the ongoing trip of today."""
+        if activity.outside_since is None:
+            return 0.0
+        return max((dt_util.now() - activity.outside_since).total_seconds(), 0.0)
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Checkpoint the totals after a delay."""
+        self._store.async_delay_save(self._data_to_save, ACTIVITY_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the totals in storable form."""
+        stored = {}
+        for pet_id, activity in self.pets.items():
+            values = asdict(activity)
+            if activity.outside_since is not None:
+                values["outside_since"] = activity.outside_since.isoformat()
+            stored[str(pet_id)] = values
+        return stored
+
+
+async def async_remove_activity(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored activity of a config entry."""
+    await Store(
+        hass, ACTIVITY_VERSION, ACTIVITY_STORAGE_KEY.format(entry_id=entry_id)
+    ).async_remove()
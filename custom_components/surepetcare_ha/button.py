@@ -2,16 +2,16 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import COMMAND_PET_LOCATION, DOMAIN
 from .coordinator import SurePetcareDataUpdateCoordinator
+from .entity import SurePetcareEntity
+from .models import Command
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,16 +23,19 @@ async def async_setup_entry(
     """Set up Sure Petcare button platform."""
     coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: list[ButtonEntity] = []
+    def _build_entities(pet_ids: set[int], device_ids: set[int]) -> list[ButtonEntity]:
+        """Create the buttons of the given pets."""
+        entities: list[ButtonEntity] = []
 
-    for pet_id, pet in coordinator.data.pets.items():
-        if pet.household_id == coordinator.household_id:
+        for pet_id in pet_ids:
             entities.append(SurePetcarePetButton(coordinator, pet_id, "inside"))
             entities.append(SurePetcarePetButton(coordinator, pet_id, "outside"))
 
-    async_add_entities(entities)
+        return entities
 
-class SurePetcarePetButton(CoordinatorEntity[SurePetcareDataUpdateCoordinator], ButtonEntity):
+    coordinator.async_add_entity_factory(_build_entities, async_add_entities)
+
+class SurePetcarePetButton(SurePetcareEntity, ButtonEntity):
     """A pet location override button."""
 
     def __init__(
@@ -42,7 +45,7 @@ class SurePetcarePetButton(CoordinatorEntity[SurePetcareDataUpdateCoordinator],
         location: str,
     ) -> None:
         """Initialize the button."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=("pet", pet_id))
         self._pet_id = pet_id
         self._location = location
         pet = self.coordinator.data.pets[pet_id]
@@ -58,19 +61,7 @@ class SurePetcarePetButton(CoordinatorEntity[SurePetcareDataUpdateCoordinator],
         
         _LOGGER.debug("Setting pet %s location to %s", self._pet_id, location_id)
         
-        try:
-            # The plan specifies sac.set_pet_location
-            await self.coordinator.api.sac.set_pet_location(self._pet_id, location_id)
-            await self.coordinator.async_request_refresh()
-        except Exception as err:
-            _LOGGER.error("Error setting pet location for pet %s: %s", self._pet_id, err)
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, f"pet_{self._pet_id}")},
-            "name": self.coordinator.data.pets[self._pet_id].name,
-            "manufacturer": "Sure Petcare",
-            "model": "Pet",
-        }
+        # The plan specifies sac.set_pet_location, the dispatcher logs failures
+        await self.coordinator.async_run_commands(
+            [Command(COMMAND_PET_LOCATION, self._pet_id, location_id)]
+        )
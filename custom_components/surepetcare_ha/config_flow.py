@@ -9,12 +9,23 @@ from surepy.exceptions import SurePetcareAuthenticationError, SurePetcareConnect
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_TOKEN
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import CONF_HOUSEHOLD_ID, DOMAIN
+from .const import (
+    CONF_HOUSEHOLD_ID,
+    CONF_FULL_POLL_INTERVAL,
+    CONF_POLL_CEILING,
+    CONF_POLL_DECAY,
+    CONF_POLL_FLOOR,
+    DEFAULT_FULL_POLL_INTERVAL,
+    DEFAULT_POLL_CEILING,
+    DEFAULT_POLL_DECAY,
+    DEFAULT_POLL_FLOOR,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,7 +51,8 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     )
 
     try:
-        # Authentication happens automatically when calling API methods
+        # Log in explicitly so the token can be stored in the entry
+        token = await surepy.sac.get_token()
         households = await surepy.get_households()
     except SurePetcareAuthenticationError as err:
         _LOGGER.error("Authentication error: %s", err)
@@ -51,10 +63,9 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     except SurePetcareConnectionError as err:
         raise CannotConnect from err
 
-    households = await surepy.get_households()
-    
     return {
         "surepy": surepy,
+        "token": token,
         "households": households,
     }
 
@@ -68,6 +79,16 @@ class SurePetcareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._email: str | None = None
         self._password: str | None = None
         self._households: list[Any] = []
+        self._surepy: Surepy | None = None
+        self._token: str | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> SurePetcareOptionsFlow:
+        """Get the options flow for this handler."""
+        return SurePetcareOptionsFlow()
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -81,6 +102,8 @@ class SurePetcareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             try:
                 validated = await validate_input(self.hass, user_input)
                 self._households = validated["households"]
+                self._surepy = validated["surepy"]
+                self._token = validated["token"]
                 
                 if not self._households:
                     return self.async_abort(reason="no_households")
@@ -136,14 +159,17 @@ class SurePetcareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             return await self._async_create_entry()
 
-        # Fetch discovery info
-        session = async_get_clientsession(self.hass)
-        surepy = Surepy(
-            self._email,
-            self._password,
-            session=session,
-        )
-        
+        # Fetch discovery info with the client that already logged in
+        surepy = self._surepy
+        if surepy is None:
+            session = async_get_clientsession(self.hass)
+            surepy = Surepy(
+                self._email,
+                self._password,
+                auth_token=self._token,
+                session=session,
+            )
+
         # We need to get data for the summary
         data = await surepy.get_data()
         
@@ -169,9 +195,53 @@ class SurePetcareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_EMAIL: self._email,
                 CONF_PASSWORD: self._password,
                 CONF_HOUSEHOLD_ID: self._household_id,
+                CONF_TOKEN: self._token,
             },
         )
 
+class SurePetcareOptionsFlow(config_entries.OptionsFlow):
+    """Handle Sure Petcare options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_POLL_FLOOR,
+                        default=options.get(
+                            CONF_POLL_FLOOR, int(DEFAULT_POLL_FLOOR.total_seconds())
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+                    vol.Required(
+                        CONF_POLL_CEILING,
+                        default=options.get(
+                            CONF_POLL_CEILING, int(DEFAULT_POLL_CEILING.total_seconds())
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+                    vol.Required(
+                        CONF_POLL_DECAY,
+                        default=options.get(CONF_POLL_DECAY, DEFAULT_POLL_DECAY),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1.0, max=4.0)),
+                    vol.Required(
+                        CONF_FULL_POLL_INTERVAL,
+                        default=options.get(
+                            CONF_FULL_POLL_INTERVAL,
+                            int(DEFAULT_FULL_POLL_INTERVAL.total_seconds()),
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=30)),
+                }
+            ),
+        )
+
 class CannotConnect(config_entries.HomeAssistantError):
     """Error to indicate we cannot connect."""
 
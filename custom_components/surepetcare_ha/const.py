@@ -7,6 +7,82 @@ LOGGER = logging.getLogger(__package__)
 
 PLATFORMS = ["sensor", "lock", "select", "device_tracker", "button"]
 
-DEFAULT_POLLING_INTERVAL = timedelta(minutes=3)
+DEFAULT_POLLING_INTERVAL = timedelta(minutes=1)
+
+
+# Adaptive polling, floor and ceiling are stored in seconds
+CONF_POLL_FLOOR = "poll_floor"
+CONF_POLL_CEILING = "poll_ceiling"
+CONF_POLL_DECAY = "poll_decay"
+# Polls only fetch the pet positions, the whole account (devices, lock
+# states, curfews, batteries) and the timelines are fetched at this interval,
+# stored in seconds
+CONF_FULL_POLL_INTERVAL = "full_poll_interval"
+
+DEFAULT_POLL_FLOOR = timedelta(seconds=30)
+DEFAULT_POLL_CEILING = timedelta(minutes=3)
+DEFAULT_POLL_DECAY = 1.25
+DEFAULT_FULL_POLL_INTERVAL = timedelta(minutes=3)
+
+# How long to poll at the floor interval after a command or pet movement
+POLL_BOOST_WINDOW = timedelta(minutes=2)
+
+# Commands sent through the dispatcher
+COMMAND_LOCK = "lock"
+COMMAND_PET_LOCATION = "pet_location"
+
+# Commands in flight at once per account, and the quiet time after the last
+# acknowledged command before the single follow-up refresh runs
+COMMAND_CONCURRENCY = 4
+COMMAND_SETTLE_DELAY = timedelta(seconds=2)
+
+# Request budget per account: sustained requests per second, burst size, and
+# how often a throttled call is resent. Retry-After values are in seconds.
+REQUEST_RATE = 2.0
+REQUEST_BURST = 20
+RATE_LIMIT_RETRIES = 3
+DEFAULT_RETRY_AFTER = 30.0
+MAX_RETRY_AFTER = 600.0
+
+# How long an unconfirmed command state is shown before falling back to the API
+OPTIMISTIC_TIMEOUT = timedelta(minutes=2)
 
 CONF_HOUSEHOLD_ID = "household_id"
+
+# Delay in seconds before the household snapshot is written to storage
+SNAPSHOT_SAVE_DELAY = 60
+
+# Household timeline ingestion
+TIMELINE_PAGE_SIZE = 25
+TIMELINE_MAX_PAGES = 4
+TIMELINE_BUFFER_SIZE = 200
+TIMELINE_SAVE_DELAY = 60
+
+# Timeline event types folded into consumption totals
+EVENT_TYPE_EAT = 22
+EVENT_TYPE_DRINK = 29
+EVENT_TYPE_ANONYMOUS_DRINK = 34
+
+# Product ids of feeders (Connect and Lite) and of the Felaqua water station
+FEEDER_PRODUCT_IDS = (4, 7)
+FELAQUA_PRODUCT_ID = 8
+
+# Location of a pet that is outside
+LOCATION_OUTSIDE = 2
+
+# Delay in seconds before the daily pet activity is checkpointed
+ACTIVITY_SAVE_DELAY = 60
+
+# Days of consumption kept per pet, bowl and water station
+CONSUMPTION_DAYS = 7
+CONSUMPTION_SAVE_DELAY = 60
+
+# Events fired on the Home Assistant bus
+EVENT_PET_MOVED = f"{DOMAIN}_pet_moved"
+EVENT_LOCK_CHANGED = f"{DOMAIN}_lock_changed"
+EVENT_BATTERY_LOW = f"{DOMAIN}_battery_low"
+
+# Key in hass.data holding the account-level pollers shared between entries
+DATA_ACCOUNTS = f"{DOMAIN}_accounts"
+# Key in hass.data holding the coordinator of every pet, across all entries
+DATA_PETS = f"{DOMAIN}_pets"
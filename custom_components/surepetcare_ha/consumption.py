@@ -0,0 +1,172 @@
+"""Daily food and water consumption folded from the household timeline."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONSUMPTION_DAYS,
+    CONSUMPTION_SAVE_DELAY,
+    DOMAIN,
+    EVENT_TYPE_ANONYMOUS_DRINK,
+    EVENT_TYPE_DRINK,
+    EVENT_TYPE_EAT,
+)
+
+CONSUMPTION_VERSION = 1
+CONSUMPTION_STORAGE_KEY = DOMAIN + ".{entry_id}.consumption"
+
+FOOD = "food"
+WATER = "water"
+
+
+def pet_key(pet_id: int) -> str:
+    """Return the aggregate key of a pet."""
+    return f"pet_{pet_id}"
+
+
+def bowl_key(device_id: int, index: int) -> str:
+    """Return the aggregate key of a feeder bowl."""
+    return f"bowl_{device_id}_{index}"
+
+
+def device_key(device_id: int) -> str:
+    """Return the aggregate key of a water station."""
+    return f"device_{device_id}"
+
+
+def _first_id(items: Any) -> int | None:
+    """Return the id of the first pet or device of an event."""
+    if items and isinstance(items, list) and isinstance(items[0], dict):
+        return items[0].get("id")
+    return None
+
+
+class ConsumptionTracker:
+    """Running daily food and water totals per pet, bowl and water station.
+
+    Only the timeline events fetched by a poll are folded in, each exactly
+    once, into per-day buckets. The last CONSUMPTION_DAYS days are kept, so
+    "today" and the rolling week are sums over a handful of numbers. The
+    buckets are saved with the id of the last folded event, so a restart
+    continues where it stopped.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self.last_event_id = 0
+        # Kind: aggregate key: ISO date: grams or millilitres
+        self.days: dict[str, dict[str, dict[str, float]]] = {FOOD: {}, WATER: {}}
+        self._store: Store[dict[str, Any]] = Store(
+            hass, CONSUMPTION_VERSION, CONSUMPTION_STORAGE_KEY.format(entry_id=entry_id)
+        )
+
+    async def async_load(self) -> None:
+        """Restore the stored buckets."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        self.last_event_id = stored.get("last_event_id", 0)
+        for kind in (FOOD, WATER):
+            self.days[kind] = stored.get("days", {}).get(kind, {})
+
+    @callback
+    def async_fold(self, events: list[dict[str, Any]]) -> set[tuple[str, int]]:
+        """Add new feeding and drinking events, return the contexts that changed."""
+        changed: set[tuple[str, int]] = set()
+        last_event_id = self.last_event_id
+
+        for event in events:
+            if event.get("id", 0) <= self.last_event_id:
+                continue
+            self.last_event_id = event["id"]
+
+            if (kind := self._kind(event.get("type"))) is None:
+                continue
+            if (created_at := dt_util.parse_datetime(event.get("created_at") or "")) is None:
+                continue
+            day = dt_util.as_local(created_at).date().isoformat()
+            pet_id = _first_id(event.get("pets"))
+
+            for weight in event.get("weights") or []:
+                device_id = weight.get("device_id") or _first_id(event.get("devices"))
+                for frame in weight.get("frames") or []:
+                    # Consumption is reported as a negative change of the bowl weight
+                    if (amount := -float(frame.get("change") or 0)) <= 0:
+                        continue
+
+                    if pet_id is not None and event["type"] != EVENT_TYPE_ANONYMOUS_DRINK:
+                        self._add(kind, pet_key(pet_id), day, amount)
+                        changed.add(("pet", pet_id))
+                    if device_id is None:
+                        continue
+                    if kind == FOOD:
+                        self._add(kind, bowl_key(device_id, frame.get("index", 0)), day, amount)
+                    else:
+                        self._add(kind, device_key(device_id), day, amount)
+                    changed.add(("device", device_id))
+
+        if changed:
+            self._prune()
+        if changed or self.last_event_id != last_event_id:
+            # Also keep the cursor past events that were not consumption
+            self._async_schedule_save()
+        return changed
+
+    def today(self, kind: str, key: str) -> float:
+        """Return the amount consumed today."""
+        return round(self.days[kind].get(key, {}).get(dt_util.now().date().isoformat(), 0.0), 1)
+
+    def week(self, kind: str, key: str) -> float:
+        """Return the amount consumed over the kept days, today included."""
+        first = (dt_util.now().date() - timedelta(days=CONSUMPTION_DAYS - 1)).isoformat()
+        return round(
+            sum(
+                amount
+                for day, amount in self.days[kind].get(key, {}).items()
+                if day >= first
+            ),
+            1,
+        )
+
+    @staticmethod
+    def _kind(event_type: Any) -> str | None:
+        """Return the consumption kind of a timeline event type."""
+        if event_type == EVENT_TYPE_EAT:
+            return FOOD
+        if event_type in (EVENT_TYPE_DRINK, EVENT_TYPE_ANONYMOUS_DRINK):
+            return WATER
+        return None
+
+    def _add(self, kind: str, key: str, day: str, amount: float) -> None:
+        """Add an amount to a day bucket."""
+        buckets = self.days[kind].setdefault(key, {})
+        buckets[day] = buckets.get(day, 0.0) + amount
+
+    def _prune(self) -> None:
+        """Drop the buckets older than the kept window."""
+        first = (dt_util.now().date() - timedelta(days=CONSUMPTION_DAYS - 1)).isoformat()
+        for aggregates in self.days.values():
+            for key, buckets in list(aggregates.items()):
+                for day in [day for day in buckets if day < first]:
+                    del buckets[day]
+                if not buckets:
+                    del aggregates[key]
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the buckets after a delay."""
+        self._store.async_delay_save(
+            lambda: {"last_event_id": self.last_event_id, "days": self.days},
+            CONSUMPTION_SAVE_DELAY,
+        )
+
+
+async def async_remove_consumption(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored consumption of a config entry."""
+    await Store(
+        hass, CONSUMPTION_VERSION, CONSUMPTION_STORAGE_KEY.format(entry_id=entry_id)
+    ).async_remove()
@@ -1,70 +1,550 @@
 """DataUpdateCoordinator for Sure Petcare."""
 from __future__ import annotations
 
-from datetime import timedelta
-import logging
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from functools import partial
+from typing import Any
 
 from surepy import Surepy
-from surepy.exceptions import SurePetcareError
 
 from homeassistant.components.persistent_notification import async_create
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later, async_track_time_change
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, LOGGER
+from .account import SurePetcareAccount
+from .activity import PetActivityTracker
+from .const import (
+    COMMAND_LOCK,
+    DATA_PETS,
+    DOMAIN,
+    EVENT_BATTERY_LOW,
+    EVENT_LOCK_CHANGED,
+    EVENT_PET_MOVED,
+    LOGGER,
+    OPTIMISTIC_TIMEOUT,
+)
+from .consumption import ConsumptionTracker
+from .curfew import CurfewEngine, async_send_curfew
+from .models import (
+    COMMAND_ATTRIBUTES,
+    Command,
+    CommandResult,
+    CurfewRecord,
+    HouseholdData,
+    PendingCommand,
+    changed_entities,
+    lock_state,
+    pet_location,
+)
+from .ratelimit import PRIORITY_COMMAND
+from .storage import SnapshotStore
+from .timeline import TimelineIngester
 
-class SurePetcareDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching Sure Petcare data."""
+# Builds a platform's entities for the given pet ids and device ids
+EntityFactory = Callable[[set[int], set[int]], list[Entity]]
+
+class SurePetcareDataUpdateCoordinator(DataUpdateCoordinator[HouseholdData]):
+    """Class to manage the Sure Petcare data of one household.
+
+    The shared account poller pushes this household's slice here. Entities
+    register with a ("pet" | "device" | "activity" | "curfew", id) context and
+    are only notified when their source changed.
+    """
 
     def __init__(
         self,
         hass: HomeAssistant,
-        api: Surepy,
+        entry_id: str,
+        account: SurePetcareAccount,
         household_id: int,
-        update_interval: timedelta,
+        snapshot_store: SnapshotStore,
+        timeline: TimelineIngester,
+        consumption: ConsumptionTracker,
+        activity: PetActivityTracker,
     ) -> None:
         """Initialize."""
         super().__init__(
             hass,
             LOGGER,
-            name=DOMAIN,
-            update_interval=update_interval,
+            name=f"{DOMAIN}_{household_id}",
+            update_interval=None,
         )
-        self.api = api
+        self.entry_id = entry_id
+        self.account = account
         self.household_id = household_id
-        self._notified_low_battery: set[int] = set()
-
-    async def _async_update_data(self):
-        """Fetch data from API."""
-        try:
-            # Fetch all data for the account
-            data = await self.api.get_data()
-            
-            # Battery Notification Logic
-            self._check_battery_levels(data)
-            
-            return data
-        except SurePetcareError as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
-
-    def _check_battery_levels(self, data) -> None:
-        """Check battery levels and notify if low."""
-        for device_id, device in data.devices.items():
-            # Only check devices in our household
-            if device.household_id != self.household_id:
+        self.snapshot_store = snapshot_store
+        self.timeline = timeline
+        self.consumption = consumption
+        self.activity = activity
+        self.curfews = CurfewEngine(hass, self.async_notify)
+        # True while the data was restored from storage and not yet refreshed
+        self.stale = False
+        # Last low battery state per device, seeded from the stored view so a
+        # restart does not report the same low battery again
+        self._low_battery: dict[int, bool] = {}
+        # Pets this coordinator holds in the pet index
+        self._indexed_pets: set[int] = set()
+        self._unsub_account: Callable[[], None] | None = None
+        self._unsub_midnight: Callable[[], None] | None = None
+        # Contexts whose daily totals changed with the last processed poll
+        self._event_contexts: set[tuple[str, int]] = set()
+        # Contexts changed by the pending update, None notifies everyone
+        self._changed: set[tuple[str, int]] | None = None
+        self.updates_sent = 0
+        self.updates_skipped = 0
+        self._pending: dict[tuple[str, int], PendingCommand] = {}
+        # Device registry info per pet and device, with the (name, type) it was built from
+        self._device_info: dict[tuple[str, int], DeviceInfo] = {}
+        self._device_info_source: dict[tuple[str, int], tuple[str, str | None]] = {}
+        self._entity_factories: list[tuple[EntityFactory, AddEntitiesCallback]] = []
+
+    @property
+    def api(self) -> Surepy:
+        """Return the API client shared with the account."""
+        return self.account.api
+
+    async def _async_update_data(self) -> HouseholdData:
+        """Return this household's data, fetching the account if needed."""
+        if self.account.data is None or not self.account.last_update_success:
+            await self.account.async_refresh()
+
+        if not self.account.last_update_success:
+            raise UpdateFailed(
+                f"Error communicating with API: {self.account.last_exception}"
+            )
+
+        return self._process(self.account.data)
+
+    async def async_request_refresh(self) -> None:
+        """Request a refresh of the shared account data."""
+        await self.account.async_request_refresh()
+
+    @callback
+    def async_restore(self, data: HouseholdData) -> None:
+        """Use a stored view until the first live fetch finishes."""
+        self.stale = True
+        self.async_seed_battery_levels(data)
+        self._update_device_info(data)
+        self._index_pets(data)
+        self.curfews.async_update(data)
+        self.async_set_updated_data(data)
+
+    @callback
+    def async_attach(self) -> None:
+        """Start receiving updates from the account poller."""
+        if self._unsub_account is None:
+            self.account.timelines[self.household_id] = self.timeline
+            self._unsub_account = self.account.async_add_listener(
+                self._handle_account_update
+            )
+            self._unsub_midnight = async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+
+    @callback
+    def async_detach(self) -> None:
+        """Stop receiving updates from the account poller."""
+        if self._unsub_account is not None:
+            self.account.timelines.pop(self.household_id, None)
+            self._unsub_account()
+            self._unsub_account = None
+        if self._unsub_midnight is not None:
+            self._unsub_midnight()
+            self._unsub_midnight = None
+        self.curfews.async_shutdown()
+        self._index_pets(HouseholdData(self.household_id))
+
+        for pending in self._pending.values():
+            pending.cancel_timeout()
+        self._pending.clear()
+
+    async def async_run_commands(self, commands: Iterable[Command]) -> list[CommandResult]:
+        """Send commands concurrently, followed by one coalesced refresh."""
+        return await self.account.dispatcher.async_dispatch(
+            commands, self._command_acknowledged
+        )
+
+    async def async_set_lock_mode(self, state: int) -> list[CommandResult]:
+        """Set every flap of the household to a lock state in one go.
+
+        Flaps that already are (or are about to be) in that state are skipped.
+        """
+        results: list[CommandResult] = []
+        commands: list[Command] = []
+        for device_id in self.data.locking_devices:
+            command = Command(COMMAND_LOCK, device_id, state)
+            current = self.optimistic_value(
+                command.context, command.attribute, lock_state(self.data.devices[device_id])
+            )
+            if current == state:
+                results.append(CommandResult(command, True, skipped=True))
+            else:
+                commands.append(command)
+
+        return results + await self.async_run_commands(commands)
+
+    async def async_set_curfew(self, device_id: int, curfews: list[CurfewRecord]) -> None:
+        """Replace the curfews of a flap and show the new schedule right away."""
+        await self.account.limiter.async_call(
+            PRIORITY_COMMAND, partial(async_send_curfew, self.api, device_id, curfews)
+        )
+        self.curfews.async_set(device_id, curfews)
+        self.async_notify({("device", device_id), ("curfew", device_id)})
+        self.account.boost_polling()
+        self.account.request_full_poll()
+        await self.async_request_refresh()
+
+    @callback
+    def _command_acknowledged(self, command: Command) -> None:
+        """Show an acknowledged command's state and poll faster for a while."""
+        self.async_set_optimistic(command.context, command.attribute, command.value)
+        self.account.boost_polling()
+
+    @callback
+    def async_set_optimistic(
+        self, context: tuple[str, int], attribute: str, value: Any
+    ) -> None:
+        """Show the target state of an acknowledged command right away."""
+        if (pending := self._pending.pop(context, None)) is not None:
+            pending.cancel_timeout()
+
+        seq = self.account.next_command_seq()
+        self._pending[context] = PendingCommand(
+            seq,
+            attribute,
+            value,
+            async_call_later(
+                self.hass,
+                OPTIMISTIC_TIMEOUT,
+                partial(self._expire_optimistic, context, seq),
+            ),
+        )
+        self.async_notify({context})
+
+    def optimistic_value(
+        self, context: tuple[str, int], attribute: str, default: Any
+    ) -> Any:
+        """Return the pending command value for an attribute, if any."""
+        pending = self._pending.get(context)
+        if pending is not None and pending.attribute == attribute:
+            return pending.value
+        return default
+
+    @callback
+    def _expire_optimistic(self, context: tuple[str, int], seq: int, _now: datetime) -> None:
+        """Drop a command state that no poll confirmed in time."""
+        pending = self._pending.get(context)
+        if pending is not None and pending.seq == seq:
+            del self._pending[context]
+            self.async_notify({context})
+
+    def _reconcile_optimistic(self, data: HouseholdData) -> None:
+        """Drop the command states confirmed by a new poll."""
+        data_seq = self.account.data_seq
+
+        for context, pending in list(self._pending.items()):
+            if data_seq < pending.seq:
+                # Fetched before the command was applied, cannot confirm or revert it
+                continue
+
+            kind, item_id = context
+            item = (data.pets if kind == "pet" else data.devices).get(item_id)
+            if item is None or COMMAND_ATTRIBUTES[pending.attribute](item) == pending.value:
+                pending.cancel_timeout()
+                del self._pending[context]
+
+    @callback
+    def async_notify(self, contexts: Iterable[tuple[str, int]]) -> None:
+        """Notify the listeners of the given pets and devices only."""
+        self._changed = set(contexts)
+        self.async_update_listeners()
+
+    @callback
+    def _handle_account_update(self) -> None:
+        """Handle a finished account poll."""
+        if not self.account.last_update_success:
+            if self.stale:
+                # Keep showing the stored view rather than going unavailable
+                self.logger.warning(
+                    "Error fetching %s data, keeping stored state: %s",
+                    self.name,
+                    self.account.last_exception,
+                )
+                return
+            if self.last_update_success:
+                self.logger.error(
+                    "Error fetching %s data: %s", self.name, self.account.last_exception
+                )
+            self.last_update_success = False
+            self.last_exception = self.account.last_exception
+            self.async_update_listeners()
+            return
+
+        household = self.account.data.get(self.household_id)
+        if (
+            self.account.unchanged
+            and household is not None
+            and household is self.data
+            and not household.new_events
+            and not self.stale
+            and self.last_update_success
+        ):
+            # Same response as the previous poll, only ongoing trips grow
+            self.async_notify(
+                ("activity", pet_id) for pet_id in self.activity.outside_pets()
+            )
+            return
+
+        data = self._process(self.account.data)
+        previous = self.data
+        if previous is not None:
+            changed = changed_entities(previous, data)
+            self._fire_events(previous, data, changed)
+            # Live data replacing the stored view refreshes everything
+            if not self.stale and self.last_update_success:
+                self._changed = changed | self._event_contexts
+        self.stale = False
+        self.async_set_updated_data(data)
+
+        if previous is not None:
+            self._async_sync_entities(previous, data)
+
+    @callback
+    def async_add_entity_factory(
+        self, factory: EntityFactory, async_add_entities: AddEntitiesCallback
+    ) -> None:
+        """Add a platform's entities now and for pets and devices added later."""
+        self._entity_factories.append((factory, async_add_entities))
+        async_add_entities(factory(set(self.data.pets), set(self.data.devices)))
+
+    @callback
+    def _async_sync_entities(self, old: HouseholdData, new: HouseholdData) -> None:
+        """Add entities for new pets and devices, remove those of gone ones."""
+        added_pets = new.pets.keys() - old.pets.keys()
+        added_devices = new.devices.keys() - old.devices.keys()
+        if added_pets or added_devices:
+            LOGGER.debug(
+                "Adding pets %s and devices %s to household %s",
+                added_pets,
+                added_devices,
+                self.household_id,
+            )
+            for factory, async_add_entities in self._entity_factories:
+                if entities := factory(added_pets, added_devices):
+                    async_add_entities(entities)
+
+        removed = [("pet", pet_id) for pet_id in old.pets.keys() - new.pets.keys()]
+        removed += [
+            ("device", device_id) for device_id in old.devices.keys() - new.devices.keys()
+        ]
+        if not removed:
+            return
+
+        registry = dr.async_get(self.hass)
+        for context in removed:
+            self._device_info.pop(context, None)
+            self._device_info_source.pop(context, None)
+
+            kind, item_id = context
+            identifier = f"pet_{item_id}" if kind == "pet" else str(item_id)
+            if device := registry.async_get_device(identifiers={(DOMAIN, identifier)}):
+                LOGGER.debug("Removing %s %s from household %s", kind, item_id, self.household_id)
+                # Also removes the entities of this entry that belong to the device
+                registry.async_update_device(device.id, remove_config_entry_id=self.entry_id)
+
+    def _fire_events(
+        self, old: HouseholdData, new: HouseholdData, changed: set[tuple[str, int]]
+    ) -> None:
+        """Fire bus events for the transitions between two views."""
+        timestamp = dt_util.utcnow().isoformat()
+
+        for kind, item_id in changed:
+            if kind == "pet":
+                if (pet := new.pets.get(item_id)) is None or (
+                    previous := old.pets.get(item_id)
+                ) is None:
+                    continue
+                old_location, new_location = pet_location(previous), pet_location(pet)
+                if old_location != new_location:
+                    since = pet.location.since
+                    self.hass.bus.async_fire(
+                        EVENT_PET_MOVED,
+                        {
+                            "household_id": self.household_id,
+                            "pet_id": item_id,
+                            "name": pet.name,
+                            "old_location": old_location,
+                            "new_location": new_location,
+                            "since": (
+                                since.isoformat() if isinstance(since, datetime) else since
+                            ),
+                            "timestamp": timestamp,
+                        },
+                    )
+                continue
+
+            if (device := new.devices.get(item_id)) is None or (
+                previous := old.devices.get(item_id)
+            ) is None:
                 continue
+            old_state, new_state = lock_state(previous), lock_state(device)
+            if old_state != new_state:
+                self.hass.bus.async_fire(
+                    EVENT_LOCK_CHANGED,
+                    {
+                        "household_id": self.household_id,
+                        "device_id": item_id,
+                        "name": device.name,
+                        "old_state": old_state,
+                        "new_state": new_state,
+                        "timestamp": timestamp,
+                    },
+                )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the listeners whose pet or device changed."""
+        changed, self._changed = self._changed, None
+
+        sent = 0
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or context in changed:
+                update_callback()
+                sent += 1
+            else:
+                self.updates_skipped += 1
+
+        self.updates_sent += sent
+        self.account.metrics.entity_updates += sent
+
+    def _process(self, households: dict[int, HouseholdData]) -> HouseholdData:
+        """Pick this household's slice and run the per-poll checks on it."""
+        data = households.get(self.household_id) or HouseholdData(self.household_id)
+
+        self._reconcile_optimistic(data)
+        self._update_device_info(data)
+        self._index_pets(data)
+
+        # Battery Notification Logic
+        self._check_battery_levels(data)
+
+        self._event_contexts = self.consumption.async_fold(data.new_events)
+        for pet_id, pet in data.pets.items():
+            if self.activity.async_observe(pet_id, pet_location(pet), pet.location.since):
+                self._event_contexts.add(("activity", pet_id))
+        # Time outside keeps growing while a pet is out
+        self._event_contexts.update(
+            ("activity", pet_id) for pet_id in self.activity.outside_pets()
+        )
+        self._event_contexts.update(
+            ("curfew", device_id) for device_id in self.curfews.async_update(data)
+        )
 
-            # Check if device has a battery flag
-            # Based on surepy 0.9.0 models, low_battery is a boolean on status
-            low_battery = getattr(device.status, "low_battery", False)
-            
-            if low_battery and device_id not in self._notified_low_battery:
+        self.snapshot_store.async_schedule_save(data)
+
+        return data
+
+    @callback
+    def _async_midnight(self, _now: datetime) -> None:
+        """Start new daily totals."""
+        if self.data is None:
+            return
+        self.activity.async_rollover(dt_util.now())
+        self.async_notify(
+            {("pet", pet_id) for pet_id in self.data.pets}
+            | {("activity", pet_id) for pet_id in self.data.pets}
+            | {
+                ("device", device_id)
+                for device_id in self.data.feeder_devices + self.data.water_devices
+            }
+        )
+
+    def _index_pets(self, data: HouseholdData) -> None:
+        """Point the pet index at the pets of this household."""
+        index: dict[int, SurePetcareDataUpdateCoordinator] = self.hass.data.setdefault(
+            DATA_PETS, {}
+        )
+        pet_ids = data.pets.keys()
+        for pet_id in self._indexed_pets - pet_ids:
+            # A pet moved to another household may already point elsewhere
+            if index.get(pet_id) is self:
+                del index[pet_id]
+        for pet_id in pet_ids - self._indexed_pets:
+            index[pet_id] = self
+        self._indexed_pets = set(pet_ids)
+
+    def device_info(self, context: tuple[str, int]) -> DeviceInfo | None:
+        """Return the cached device registry info of a pet or device."""
+        return self._device_info.get(context)
+
+    def _update_device_info(self, data: HouseholdData) -> None:
+        """Rebuild the device info of pets and devices whose name or type changed."""
+        for pet_id, pet in data.pets.items():
+            self._cache_device_info(("pet", pet_id), pet.name, None)
+
+        for device_id, device in data.devices.items():
+            self._cache_device_info(("device", device_id), device.name, device.type)
+
+    def _cache_device_info(
+        self, context: tuple[str, int], name: str, type_name: str | None
+    ) -> None:
+        """Build the device info of one pet or device unless it is unchanged."""
+        if self._device_info_source.get(context) == (name, type_name):
+            return
+
+        kind, item_id = context
+        if kind == "pet":
+            identifier = f"pet_{item_id}"
+            model = "Pet"
+        else:
+            identifier = str(item_id)
+            model = type_name.replace("_", " ").title() if type_name is not None else None
+
+        self._device_info_source[context] = (name, type_name)
+        self._device_info[context] = DeviceInfo(
+            identifiers={(DOMAIN, identifier)},
+            name=name,
+            manufacturer="Sure Petcare",
+            model=model,
+        )
+
+    @callback
+    def async_seed_battery_levels(self, data: HouseholdData) -> None:
+        """Take the low battery states of a stored view as the previous ones."""
+        for device_id in data.battery_devices:
+            self._low_battery[device_id] = bool(data.devices[device_id].status.low_battery)
+
+    def _check_battery_levels(self, data: HouseholdData) -> None:
+        """Check battery levels and notify if low."""
+        for device_id in data.battery_devices:
+            device = data.devices[device_id]
+            low_battery = bool(device.status.low_battery)
+            # None if the device was never seen before
+            previous = self._low_battery.get(device_id)
+            self._low_battery[device_id] = low_battery
+
+            if low_battery and not previous:
+                self.hass.bus.async_fire(
+                    EVENT_BATTERY_LOW,
+                    {
+                        "household_id": self.household_id,
+                        "device_id": device_id,
+                        "name": device.name,
+                        "old_value": previous,
+                        "new_value": True,
+                        "timestamp": dt_util.utcnow().isoformat(),
+                    },
+                )
                 async_create(
                     self.hass,
                     title="Sure Petcare Low Battery",
                     message=f"The battery in {device.name} is low.",
                     notification_id=f"{DOMAIN}_low_battery_{device_id}",
                 )
-                self._notified_low_battery.add(device_id)
-            elif not low_battery and device_id in self._notified_low_battery:
-                self._notified_low_battery.discard(device_id)
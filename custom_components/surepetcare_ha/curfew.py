@@ -0,0 +1,194 @@
+"""Curfew schedules of the Sure Petcare flaps."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from surepy import Surepy
+from surepy.const import BASE_RESOURCE, CONTROL_RESOURCE
+from surepy.exceptions import SurePetcareError
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+from .models import CurfewRecord, HouseholdData
+
+
+def _parse_time(value: Any) -> time | None:
+    """Return a curfew time from a time or an "HH:MM" string."""
+    if isinstance(value, time):
+        return value
+    if isinstance(value, str):
+        return dt_util.parse_time(value)
+    return None
+
+
+def _format_time(value: Any) -> Any:
+    """Return a curfew time as the "HH:MM" string the API expects."""
+    if isinstance(value, time):
+        return value.strftime("%H:%M")
+    return value
+
+
+@dataclass(slots=True, frozen=True)
+class CurfewSchedule:
+    """The enabled curfew windows of a flap, parsed once.
+
+    A window locks at its lock time and unlocks at its unlock time, and may
+    run past midnight. Times are taken as local times.
+    """
+
+    windows: tuple[tuple[time, time], ...]
+
+    @classmethod
+    def from_records(cls, curfews: Iterable[CurfewRecord]) -> CurfewSchedule:
+        """Parse the enabled curfews of a flap."""
+        windows = []
+        for curfew in curfews:
+            lock_time = _parse_time(curfew.lock_time)
+            unlock_time = _parse_time(curfew.unlock_time)
+            if curfew.enabled and lock_time is not None and unlock_time is not None:
+                windows.append((lock_time, unlock_time))
+        return cls(tuple(windows))
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if any curfew is enabled."""
+        return bool(self.windows)
+
+    def active_at(self, moment: datetime) -> bool:
+        """Return True if a curfew locks the flap at a moment."""
+        now = dt_util.as_local(moment).time()
+        for lock_time, unlock_time in self.windows:
+            if lock_time <= unlock_time:
+                if lock_time <= now < unlock_time:
+                    return True
+            elif now >= lock_time or now < unlock_time:
+                return True
+        return False
+
+    def next_transition(self, moment: datetime) -> tuple[datetime, bool] | None:
+        """Return the next lock or unlock edge after a moment, True for a lock."""
+        local = dt_util.as_local(moment)
+        edges: list[tuple[datetime, bool]] = []
+        for lock_time, unlock_time in self.windows:
+            for edge_time, locks in ((lock_time, True), (unlock_time, False)):
+                edge = datetime.combine(local.date(), edge_time, local.tzinfo)
+                if edge <= local:
+                    edge = datetime.combine(
+                        local.date() + timedelta(days=1), edge_time, local.tzinfo
+                    )
+                edges.append((edge, locks))
+        return min(edges, default=None)
+
+
+class CurfewEngine:
+    """Keep the parsed schedule and the next transition of every flap.
+
+    Schedules are only parsed when the curfews of a flap changed. A single
+    time tracker per flap fires at its next lock or unlock edge, so curfew
+    entities change state on time instead of at the next poll.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        notify: Callable[[set[tuple[str, int]]], None],
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._notify = notify
+        # Device id: (curfews the schedule was parsed from, schedule)
+        self._schedules: dict[int, tuple[list[CurfewRecord], CurfewSchedule]] = {}
+        self.next_transitions: dict[int, tuple[datetime, bool]] = {}
+        self._unsub_timers: dict[int, CALLBACK_TYPE] = {}
+
+    def schedule(self, device_id: int) -> CurfewSchedule | None:
+        """Return the parsed schedule of a flap."""
+        if (entry := self._schedules.get(device_id)) is None:
+            return None
+        return entry[1]
+
+    @callback
+    def async_update(self, data: HouseholdData) -> set[int]:
+        """Parse the changed schedules of a view, return the flaps that changed."""
+        changed: set[int] = set()
+
+        for device_id in data.curfew_devices:
+            curfews = data.devices[device_id].status.curfew or []
+            if (entry := self._schedules.get(device_id)) is not None and entry[0] == curfews:
+                continue
+            self.async_set(device_id, curfews)
+            changed.add(device_id)
+
+        for device_id in self._schedules.keys() - set(data.curfew_devices):
+            self._async_cancel(device_id)
+            del self._schedules[device_id]
+            self.next_transitions.pop(device_id, None)
+            changed.add(device_id)
+
+        return changed
+
+    @callback
+    def async_set(self, device_id: int, curfews: list[CurfewRecord]) -> None:
+        """Replace the schedule of a flap and plan its next transition."""
+        self._schedules[device_id] = (list(curfews), CurfewSchedule.from_records(curfews))
+        self._async_plan(device_id)
+
+    @callback
+    def _async_plan(self, device_id: int) -> None:
+        """Track the next transition of a flap."""
+        self._async_cancel(device_id)
+        transition = self._schedules[device_id][1].next_transition(dt_util.now())
+        if transition is None:
+            self.next_transitions.pop(device_id, None)
+            return
+
+        self.next_transitions[device_id] = transition
+
+        @callback
+        def _async_transition(_now: datetime) -> None:
+            self._unsub_timers.pop(device_id, None)
+            self._async_plan(device_id)
+            self._notify({("curfew", device_id)})
+
+        self._unsub_timers[device_id] = async_track_point_in_time(
+            self.hass, _async_transition, transition[0]
+        )
+
+    @callback
+    def _async_cancel(self, device_id: int) -> None:
+        """Stop tracking the next transition of a flap."""
+        if (unsub := self._unsub_timers.pop(device_id, None)) is not None:
+            unsub()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop tracking all transitions."""
+        for unsub in self._unsub_timers.values():
+            unsub()
+        self._unsub_timers.clear()
+
+
+async def async_send_curfew(
+    api: Surepy, device_id: int, curfews: list[CurfewRecord]
+) -> None:
+    """Replace the curfews of a flap."""
+    resource = CONTROL_RESOURCE.format(BASE_RESOURCE=BASE_RESOURCE, device_id=device_id)
+    payload = {
+        "curfew": [
+            {
+                "enabled": curfew.enabled,
+                "lock_time": _format_time(curfew.lock_time),
+                "unlock_time": _format_time(curfew.unlock_time),
+            }
+            for curfew in curfews
+        ]
+    }
+
+    response = await api.sac.call(method="PUT", resource=resource, json=payload)
+    if not response or "data" not in response:
+        raise SurePetcareError(f"Setting the curfew of {device_id} failed")
@@ -9,10 +9,11 @@ from homeassistant.components.device_tracker.config_entry import TrackerEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import SurePetcareDataUpdateCoordinator
+from .entity import SurePetcareEntity
+from .models import pet_location
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,20 +25,20 @@ async def async_setup_entry(
     """Set up Sure Petcare device tracker platform."""
     coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: list[SurePetcarePetTracker] = []
+    def _build_entities(
+        pet_ids: set[int], device_ids: set[int]
+    ) -> list[SurePetcarePetTracker]:
+        """Create the trackers of the given pets."""
+        return [SurePetcarePetTracker(coordinator, pet_id) for pet_id in pet_ids]
 
-    for pet_id, pet in coordinator.data.pets.items():
-        if pet.household_id == coordinator.household_id:
-            entities.append(SurePetcarePetTracker(coordinator, pet_id))
+    coordinator.async_add_entity_factory(_build_entities, async_add_entities)
 
-    async_add_entities(entities)
-
-class SurePetcarePetTracker(CoordinatorEntity[SurePetcareDataUpdateCoordinator], TrackerEntity):
+class SurePetcarePetTracker(SurePetcareEntity, TrackerEntity):
     """A pet device tracker."""
 
     def __init__(self, coordinator: SurePetcareDataUpdateCoordinator, pet_id: int) -> None:
         """Initialize the tracker."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=("pet", pet_id))
         self._pet_id = pet_id
         pet = self.coordinator.data.pets[pet_id]
         self._attr_name = pet.name
@@ -48,6 +49,13 @@ class SurePetcarePetTracker(CoordinatorEntity[SurePetcareDataUpdateCoordinator],
         """Return the pet object."""
         return self.coordinator.data.pets.get(self._pet_id)
 
+    @property
+    def location_id(self) -> int:
+        """Return the location id, including a pending manual override."""
+        return self.coordinator.optimistic_value(
+            ("pet", self._pet_id), "where", pet_location(self.pet)
+        )
+
     @property
     def source_type(self) -> SourceType:
         """Return the source type."""
@@ -60,8 +68,8 @@ class SurePetcarePetTracker(CoordinatorEntity[SurePetcareDataUpdateCoordinator],
             return "Unknown"
 
         # Map Sure Petcare location IDs: 1: Inside, 2: Outside, 0: Unknown
-        location_id = getattr(self.pet.location, "where", 0)
-        
+        location_id = self.location_id
+
         if location_id == 1:
             return "Inside"
         if location_id == 2:
@@ -84,7 +92,7 @@ class SurePetcarePetTracker(CoordinatorEntity[SurePetcareDataUpdateCoordinator],
         """Return the pet's photo if available."""
         if not self.pet:
             return None
-        return getattr(self.pet, "photo_url", None)
+        return self.pet.photo_url
 
     @property
     def icon(self) -> str | None:
@@ -95,7 +103,7 @@ class SurePetcarePetTracker(CoordinatorEntity[SurePetcareDataUpdateCoordinator],
         if not self.pet:
             return "mdi:help-circle-outline"
             
-        species = getattr(self.pet, "species_name", "").lower()
+        species = (self.pet.species_name or "").lower()
         if "cat" in species:
             return "mdi:cat"
         if "dog" in species:
@@ -106,23 +114,12 @@ class SurePetcarePetTracker(CoordinatorEntity[SurePetcareDataUpdateCoordinator],
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return entity specific state attributes."""
-        attrs = {}
+        attrs = dict(super().extra_state_attributes or {})
         if self.pet:
             attrs["pet_id"] = self._pet_id
-            attrs["location_since"] = getattr(self.pet.location, "since", None)
+            attrs["location_since"] = self.pet.location.since
             
             # Map location ID for reference
-            location_id = getattr(self.pet.location, "where", 0)
-            attrs["location_id"] = location_id
+            attrs["location_id"] = self.location_id
             
         return attrs
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, f"pet_{self._pet_id}")},
-            "name": self._attr_name,
-            "manufacturer": "Sure Petcare",
-            "model": "Pet",
-        }
@@ -0,0 +1,51 @@
+"""Diagnostics support for Sure Petcare."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, CONF_TOKEN
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import SurePetcareDataUpdateCoordinator
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, CONF_TOKEN}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    account = coordinator.account
+    data = coordinator.data
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "account": {
+            "households": len(account.entry_ids),
+            "last_update_success": account.last_update_success,
+            "last_exception": repr(account.last_exception) if account.last_exception else None,
+            "update_interval": (
+                account.update_interval.total_seconds() if account.update_interval else None
+            ),
+            "polling_boosted": account.scheduler.boosted,
+            "metrics": account.metrics.as_dict(),
+            "rate_limiter": account.limiter.as_dict(),
+        },
+        "household": {
+            "household_id": coordinator.household_id,
+            "stale": coordinator.stale,
+            "pets": len(data.pets) if data else 0,
+            "devices": len(data.devices) if data else 0,
+            "updates_sent": coordinator.updates_sent,
+            "updates_skipped": coordinator.updates_skipped,
+            "timeline_cursor": coordinator.timeline.cursor,
+            "timeline_events": len(coordinator.timeline.events),
+        },
+    }
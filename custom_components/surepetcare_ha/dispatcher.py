@@ -0,0 +1,102 @@
+"""Command dispatching for the Sure Petcare integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from datetime import datetime, timedelta
+from functools import partial
+
+from surepy import Surepy
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import COMMAND_LOCK, LOGGER
+from .models import Command, CommandResult
+from .ratelimit import PRIORITY_COMMAND, RequestLimiter
+
+
+class CommandDispatcher:
+    """Run commands for an account concurrently and coalesce their refreshes.
+
+    At most `limit` commands are in flight at once. Every acknowledged command
+    (re)arms a single refresh that runs once no command was acknowledged for
+    `settle`, so a burst of commands costs one account fetch.
+
+    Commands take their tokens from the account's RequestLimiter ahead of
+    queued polls.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: Surepy,
+        limiter: RequestLimiter,
+        request_refresh: Callable[[], Awaitable[None]],
+        limit: int,
+        settle: timedelta,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.api = api
+        self.limiter = limiter
+        self._request_refresh = request_refresh
+        self._semaphore = asyncio.Semaphore(limit)
+        self._settle = settle
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+
+    async def async_dispatch(
+        self,
+        commands: Iterable[Command],
+        on_success: Callable[[Command], None],
+    ) -> list[CommandResult]:
+        """Send commands and return a result for each of them, in order."""
+        results = await asyncio.gather(
+            *(self._async_run(command, on_success) for command in commands)
+        )
+
+        if any(result.success for result in results):
+            self._async_schedule_refresh()
+
+        return list(results)
+
+    async def _async_run(
+        self, command: Command, on_success: Callable[[Command], None]
+    ) -> CommandResult:
+        """Send one command and report how it went."""
+        async with self._semaphore:
+            try:
+                if command.kind == COMMAND_LOCK:
+                    send = partial(self.api.sac.set_lock_state, command.target_id, command.value)
+                else:
+                    send = partial(self.api.sac.set_pet_location, command.target_id, command.value)
+                await self.limiter.async_call(PRIORITY_COMMAND, send)
+            except Exception as err:  # pylint: disable=broad-except
+                LOGGER.error(
+                    "Error sending %s command for %s: %s", command.kind, command.target_id, err
+                )
+                return CommandResult(command, False, str(err))
+
+        on_success(command)
+        return CommandResult(command, True)
+
+    @callback
+    def _async_schedule_refresh(self) -> None:
+        """(Re)arm the refresh that follows a burst of commands."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+        self._unsub_refresh = async_call_later(
+            self.hass, self._settle, self._async_settled_refresh
+        )
+
+    async def _async_settled_refresh(self, _now: datetime) -> None:
+        """Refresh the account once the burst has settled."""
+        self._unsub_refresh = None
+        await self._request_refresh()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel a pending refresh."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
@@ -0,0 +1,28 @@
+"""Base entity for the Sure Petcare integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import SurePetcareDataUpdateCoordinator
+
+
+class SurePetcareEntity(CoordinatorEntity[SurePetcareDataUpdateCoordinator]):
+    """Base class for Sure Petcare entities.
+
+    Entities are created with a ("pet" | "device", id) coordinator context.
+    """
+
+    @property
+    def device_info(self) -> DeviceInfo | None:
+        """Return the device information cached by the coordinator."""
+        return self.coordinator.device_info(self.coordinator_context)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag states restored from the last snapshot until live data arrives."""
+        if self.coordinator.stale:
+            return {"stale": True}
+        return None
@@ -6,11 +6,13 @@ from typing import Any
 from homeassistant.components.lock import LockEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import COMMAND_LOCK, DOMAIN
 from .coordinator import SurePetcareDataUpdateCoordinator
+from .entity import SurePetcareEntity
+from .models import Command, lock_state
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -20,21 +22,22 @@ async def async_setup_entry(
     """Set up Sure Petcare locks."""
     coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: list[SurePetcareLock] = []
+    def _build_entities(pet_ids: set[int], device_ids: set[int]) -> list[SurePetcareLock]:
+        """Create the entities of the given lock-capable devices."""
+        return [
+            SurePetcareLock(coordinator, device_id)
+            for device_id in coordinator.data.locking_devices
+            if device_id in device_ids
+        ]
 
-    for device_id, device in coordinator.data.devices.items():
-        if device.household_id == coordinator.household_id:
-            if hasattr(device.status, "locking"):
-                entities.append(SurePetcareLock(coordinator, device_id))
+    coordinator.async_add_entity_factory(_build_entities, async_add_entities)
 
-    async_add_entities(entities)
-
-class SurePetcareLock(CoordinatorEntity[SurePetcareDataUpdateCoordinator], LockEntity):
+class SurePetcareLock(SurePetcareEntity, LockEntity):
     """Sure Petcare lock entity."""
 
     def __init__(self, coordinator: SurePetcareDataUpdateCoordinator, device_id: int) -> None:
         """Initialize the lock."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=("device", device_id))
         self._device_id = device_id
         device = coordinator.data.devices[device_id]
         self._attr_name = f"{device.name} Exit Lock"
@@ -44,7 +47,7 @@ class SurePetcareLock(CoordinatorEntity[SurePetcareDataUpdateCoordinator], LockE
     def is_locked(self) -> bool:
         """Return true if locked."""
         device = self.coordinator.data.devices.get(self._device_id)
-        if not device or not hasattr(device.status, "locking"):
+        if not device or device.status.locking is None:
             return False
         
         # Sure Petcare lock states:
@@ -53,37 +56,27 @@ class SurePetcareLock(CoordinatorEntity[SurePetcareDataUpdateCoordinator], LockE
         # 2: Locked Out
         # 3: Locked All
         # Mapping: locked_in (1) or locked_all (3) counts as "locked" for this entity
-        # Based on surepy, locking can be an int or a LockState enum
-        locking_state = device.status.locking
-        if not isinstance(locking_state, int):
-            locking_state = getattr(locking_state, "value", locking_state)
-            
+        locking_state = self.coordinator.optimistic_value(
+            ("device", self._device_id), "locking", lock_state(device)
+        )
+
         return locking_state in [1, 3]
 
     async def async_lock(self, **kwargs: Any) -> None:
         """Lock the flap."""
         # We map "lock" to "Locked In" (cannot exit)
         # 1 = LOCKED_IN
-        await self.coordinator.api.sac.set_lock_state(self._device_id, 1)
-        await self.coordinator.async_request_refresh()
+        await self._async_set_lock_state(1)
 
     async def async_unlock(self, **kwargs: Any) -> None:
         """Unlock the flap."""
         # 0 = UNLOCKED
-        await self.coordinator.api.sac.set_lock_state(self._device_id, 0)
-        await self.coordinator.async_request_refresh()
-
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        device = self.coordinator.data.devices[self._device_id]
-        model = None
-        if hasattr(device, "type"):
-            model = getattr(device.type, "name", str(device.type)).replace("_", " ").title()
+        await self._async_set_lock_state(0)
 
-        return {
-            "identifiers": {(DOMAIN, str(self._device_id))},
-            "name": device.name,
-            "manufacturer": "Sure Petcare",
-            "model": model,
-        }
+    async def _async_set_lock_state(self, state: int) -> None:
+        """Send a lock state command through the coordinator."""
+        [result] = await self.coordinator.async_run_commands(
+            [Command(COMMAND_LOCK, self._device_id, state)]
+        )
+        if not result.success:
+            raise HomeAssistantError(f"Error setting lock state of {self.name}: {result.error}")
@@ -0,0 +1,163 @@
+"""Runtime metrics of the Sure Petcare polling pipeline."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+import re
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import (
+    ClientSession,
+    TraceConfig,
+    TraceRequestEndParams,
+    TraceRequestExceptionParams,
+    TraceResponseChunkReceivedParams,
+    hdrs,
+)
+
+# Upper bounds of the latency buckets in seconds, the last bucket is open
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_ID_PATTERN = re.compile(r"/\d+")
+
+
+def endpoint_name(path: str) -> str:
+    """Return an API path with its ids replaced, e.g. "device/{id}/control"."""
+    return _ID_PATTERN.sub("/{id}", path.split("/api/", 1)[-1]).strip("/")
+
+
+class LatencyHistogram:
+    """Bucketed latencies with their count, sum and maximum."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add a latency."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as plain values."""
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "last": round(self.last, 6),
+            "buckets": dict(zip(bounds, self.buckets)),
+        }
+
+
+class PollMetrics:
+    """Counters and latencies of an account poller.
+
+    Every poll is split in the API time (fetching the account and timelines),
+    the parse time (projecting the JSON by household, in the executor) and
+    the fan-out time (pushing the result to the households and their
+    entities). The loop time is how long a poll blocked the event loop: the
+    synchronous merge after the executor job plus the fan-out. HTTP calls are
+    counted by endpoint through an aiohttp trace config on the account
+    session.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.api_time = LatencyHistogram()
+        self.parse_time = LatencyHistogram()
+        self.fanout_time = LatencyHistogram()
+        # CPU time of the event loop thread during a poll, its fan-out included
+        self.loop_time = LatencyHistogram()
+        self.api_calls: Counter[str] = Counter()
+        self.http_errors: Counter[str] = Counter()
+        self.polls = 0
+        # Polls that fetched the whole account rather than the pet positions
+        self.full_polls = 0
+        # Polls whose response matched the previous one and were not processed
+        self.unchanged_polls = 0
+        self.errors = 0
+        self.retries = 0
+        self.logins = 0
+        self.bytes_received = 0
+        self.last_payload_bytes = 0
+        # Entity state writes, in total and caused by the last poll
+        self.entity_updates = 0
+        self.last_entity_updates = 0
+
+    def trace_config(self) -> TraceConfig:
+        """Return a trace config that counts the HTTP calls of a session."""
+        trace_config = TraceConfig()
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        trace_config.on_response_chunk_received.append(self._on_chunk_received)
+        return trace_config
+
+    async def _on_request_end(
+        self,
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        params: TraceRequestEndParams,
+    ) -> None:
+        """Count a finished request."""
+        if params.method == hdrs.METH_OPTIONS:
+            # surepy sends a preflight before every call, count the call once
+            return
+        endpoint = endpoint_name(params.url.path)
+        self.api_calls[endpoint] += 1
+        if params.response.status >= 400:
+            self.http_errors[f"{endpoint} {params.response.status}"] += 1
+
+    async def _on_request_exception(
+        self,
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        params: TraceRequestExceptionParams,
+    ) -> None:
+        """Count a request that failed without a response."""
+        if params.method == hdrs.METH_OPTIONS:
+            return
+        endpoint = endpoint_name(params.url.path)
+        self.api_calls[endpoint] += 1
+        self.http_errors[f"{endpoint} {type(params.exception).__name__}"] += 1
+
+    async def _on_chunk_received(
+        self,
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        params: TraceResponseChunkReceivedParams,
+    ) -> None:
+        """Count the received payload bytes."""
+        if params.method == hdrs.METH_OPTIONS:
+            return
+        self.bytes_received += len(params.chunk)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as plain values."""
+        return {
+            "polls": self.polls,
+            "full_polls": self.full_polls,
+            "unchanged_polls": self.unchanged_polls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "logins": self.logins,
+            "api_calls": dict(self.api_calls),
+            "http_errors": dict(self.http_errors),
+            "bytes_received": self.bytes_received,
+            "last_payload_bytes": self.last_payload_bytes,
+            "entity_updates": self.entity_updates,
+            "last_entity_updates": self.last_entity_updates,
+            "api_time": self.api_time.as_dict(),
+            "parse_time": self.parse_time.as_dict(),
+            "fanout_time": self.fanout_time.as_dict(),
+            "loop_time": self.loop_time.as_dict(),
+        }
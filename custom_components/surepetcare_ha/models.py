@@ -0,0 +1,340 @@
+"""Data models for the Sure Petcare integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from enum import IntEnum
+from typing import Any
+
+from surepy.const import SURE_BATT_VOLTAGE_LOW
+from surepy.enums import EntityType, Species
+
+from homeassistant.util import dt as dt_util
+
+from .const import COMMAND_LOCK, FEEDER_PRODUCT_IDS, FELAQUA_PRODUCT_ID
+
+
+@dataclass(slots=True)
+class CurfewRecord:
+    """One curfew of a flap."""
+
+    enabled: bool
+    lock_time: Any = None
+    unlock_time: Any = None
+
+
+@dataclass(slots=True)
+class StatusRecord:
+    """Status of a pet or device, None where it does not apply."""
+
+    since: Any = None
+    # Lock state as an int, only set for flaps
+    locking: int | None = None
+    curfew: list[CurfewRecord] | None = None
+    low_battery: bool | None = None
+    battery: Any = None
+
+
+@dataclass(slots=True)
+class LocationRecord:
+    """Location of a pet (0: Unknown, 1: Inside, 2: Outside)."""
+
+    where: int = 0
+    since: Any = None
+
+
+@dataclass(slots=True)
+class PetRecord:
+    """The parts of a pet the platforms read."""
+
+    name: str
+    household_id: int
+    location: LocationRecord
+    status: StatusRecord
+    photo_url: str | None = None
+    species_name: str | None = None
+
+
+@dataclass(slots=True)
+class DeviceRecord:
+    """The parts of a device the platforms read."""
+
+    name: str
+    household_id: int
+    status: StatusRecord
+    # Name of the product type, e.g. "CAT_FLAP"
+    type: str | None = None
+    serial_number: str | None = None
+    product_id: int | None = None
+    # Number of bowls of a feeder
+    bowl_count: int | None = None
+
+
+def _enum_value(value: Any) -> Any:
+    """Return the value of an enum member, anything else unchanged."""
+    if value is None or isinstance(value, int):
+        return value
+    return getattr(value, "value", value)
+
+
+def _enum_name(enum: type[IntEnum], value: Any) -> str | None:
+    """Return the member name of an API enum value, None if unknown."""
+    try:
+        return enum(value).name
+    except (TypeError, ValueError):
+        return None
+
+
+def _datetime(value: Any) -> datetime | None:
+    """Return an API timestamp as a datetime."""
+    if isinstance(value, str):
+        value = dt_util.parse_datetime(value)
+    return value if isinstance(value, datetime) else None
+
+
+def _project_status(item: dict[str, Any]) -> StatusRecord:
+    """Reduce the status and controls of an API pet or device to a StatusRecord."""
+    status = item.get("status") or {}
+    control = item.get("control") or {}
+
+    locking = status.get("locking")
+    if isinstance(locking, dict):
+        locking = locking.get("mode")
+
+    curfew = control.get("curfew")
+    if curfew is not None:
+        curfew = [
+            CurfewRecord(
+                bool(entry.get("enabled", False)),
+                entry.get("lock_time"),
+                entry.get("unlock_time"),
+            )
+            for entry in (curfew if isinstance(curfew, list) else [curfew])
+        ]
+
+    battery = status.get("battery")
+    low_battery = None
+    if isinstance(battery, (int, float)):
+        # Voltage of four cells
+        low_battery = battery / 4 <= SURE_BATT_VOLTAGE_LOW
+
+    return StatusRecord(
+        since=_datetime(item.get("updated_at")),
+        locking=locking,
+        curfew=curfew,
+        low_battery=low_battery,
+        battery=battery,
+    )
+
+
+def _project_location(where: Any, since: Any) -> LocationRecord:
+    """Return a location record with an int location and a datetime since."""
+    return LocationRecord(_enum_value(where) or 0, _datetime(since))
+
+
+def project_pet(pet: dict[str, Any]) -> PetRecord:
+    """Reduce an API pet to the fields the platforms read."""
+    position = pet.get("position") or {}
+    return PetRecord(
+        name=pet.get("name") or "Unnamed",
+        household_id=pet["household_id"],
+        location=_project_location(position.get("where"), position.get("since")),
+        status=_project_status(pet),
+        photo_url=(pet.get("photo") or {}).get("location"),
+        species_name=_enum_name(Species, pet.get("species_id")),
+    )
+
+
+def project_device(device: dict[str, Any]) -> DeviceRecord:
+    """Reduce an API device to the fields the platforms read."""
+    bowls = ((device.get("control") or {}).get("bowls") or {}).get("settings")
+    return DeviceRecord(
+        name=device.get("name") or "Unknown",
+        household_id=device["household_id"],
+        status=_project_status(device),
+        type=_enum_name(EntityType, device.get("product_id")),
+        serial_number=device.get("serial_number"),
+        product_id=device.get("product_id"),
+        bowl_count=len(bowls) if bowls else None,
+    )
+
+
+@dataclass
+class HouseholdData:
+    """Indexed view of the account data that belongs to one household.
+
+    Built once per poll so platforms and services can look pets and devices
+    up directly instead of filtering the whole account. Pets and devices are
+    kept as compact records, so the response of a fetch can be released.
+    """
+
+    household_id: int
+    pets: dict[int, PetRecord] = field(default_factory=dict)
+    devices: dict[int, DeviceRecord] = field(default_factory=dict)
+    # Device ids by capability
+    locking_devices: list[int] = field(default_factory=list)
+    curfew_devices: list[int] = field(default_factory=list)
+    battery_devices: list[int] = field(default_factory=list)
+    feeder_devices: list[int] = field(default_factory=list)
+    water_devices: list[int] = field(default_factory=list)
+    # Pet ids with a battery (e.g. collar tags reporting status)
+    battery_pets: list[int] = field(default_factory=list)
+    # Timeline events fetched by this poll, oldest first
+    new_events: list[dict[str, Any]] = field(default_factory=list)
+
+    def add_device(self, device_id: int, device: DeviceRecord) -> None:
+        """Add a device and index its capabilities."""
+        self.devices[device_id] = device
+
+        if device.status.locking is not None:
+            self.locking_devices.append(device_id)
+        if device.status.curfew is not None:
+            self.curfew_devices.append(device_id)
+        if _has_battery(device):
+            self.battery_devices.append(device_id)
+        if device.product_id in FEEDER_PRODUCT_IDS:
+            self.feeder_devices.append(device_id)
+        elif device.product_id == FELAQUA_PRODUCT_ID:
+            self.water_devices.append(device_id)
+
+    def add_pet(self, pet_id: int, pet: PetRecord) -> None:
+        """Add a pet and index it."""
+        self.pets[pet_id] = pet
+
+        if _has_battery(pet):
+            self.battery_pets.append(pet_id)
+
+
+@dataclass(frozen=True)
+class Command:
+    """A lock or pet location command."""
+
+    # COMMAND_LOCK or COMMAND_PET_LOCATION
+    kind: str
+    # Device id for lock commands, pet id for pet location commands
+    target_id: int
+    value: int
+
+    @property
+    def context(self) -> tuple[str, int]:
+        """Return the listener context of the target."""
+        return ("device" if self.kind == COMMAND_LOCK else "pet", self.target_id)
+
+    @property
+    def attribute(self) -> str:
+        """Return the attribute the command changes."""
+        return "locking" if self.kind == COMMAND_LOCK else "where"
+
+
+@dataclass
+class CommandResult:
+    """The outcome of a dispatched command."""
+
+    command: Command
+    success: bool
+    error: str | None = None
+    # True if the target already was in the requested state and nothing was sent
+    skipped: bool = False
+
+
+@dataclass
+class PendingCommand:
+    """A command whose target state is shown before a poll confirms it."""
+
+    # Account command sequence number assigned when the API acknowledged it
+    seq: int
+    attribute: str
+    value: Any
+    cancel_timeout: Callable[[], None]
+
+
+def lock_state(device: DeviceRecord) -> int | None:
+    """Return the lock state of a flap as an int, None if it cannot lock."""
+    return device.status.locking
+
+
+def pet_location(pet: PetRecord) -> int:
+    """Return the location of a pet as an int (0: Unknown, 1: Inside, 2: Outside)."""
+    return pet.location.where
+
+
+# Readers for the attributes commands can set optimistically
+COMMAND_ATTRIBUTES: dict[str, Callable[[Any], Any]] = {
+    "locking": lock_state,
+    "where": pet_location,
+}
+
+
+def changed_entities(old: HouseholdData, new: HouseholdData) -> set[tuple[str, int]]:
+    """Return the (kind, id) of every pet and device that differs between two views."""
+    changed: set[tuple[str, int]] = set()
+
+    for kind, old_items, new_items in (
+        ("pet", old.pets, new.pets),
+        ("device", old.devices, new.devices),
+    ):
+        for item_id, item in new_items.items():
+            previous = old_items.get(item_id)
+            # Records compare field by field
+            if previous is None or previous != item:
+                changed.add((kind, item_id))
+        changed.update((kind, item_id) for item_id in old_items.keys() - new_items.keys())
+
+    return changed
+
+
+def _has_battery(entity: PetRecord | DeviceRecord) -> bool:
+    """Return True if the entity reports battery information."""
+    return entity.status.battery is not None or entity.status.low_battery is not None
+
+
+def split_by_household(data: dict[str, Any]) -> dict[int, HouseholdData]:
+    """Split the data of a me/start response into per-household views in one pass.
+
+    Every pet and device is projected straight from the API JSON to a record,
+    without building surepy objects first.
+    """
+    households: dict[int, HouseholdData] = {}
+
+    def _household(household_id: int) -> HouseholdData:
+        if (household := households.get(household_id)) is None:
+            household = households[household_id] = HouseholdData(household_id)
+        return household
+
+    for device in data.get("devices") or []:
+        record = project_device(device)
+        _household(record.household_id).add_device(device["id"], record)
+
+    for pet in data.get("pets") or []:
+        record = project_pet(pet)
+        _household(record.household_id).add_pet(pet["id"], record)
+
+    return households
+
+
+def merge_positions(
+    households: dict[int, HouseholdData], positions: list[dict[str, Any]]
+) -> dict[int, HouseholdData]:
+    """Apply the pet positions of a position poll to the previous views.
+
+    Returns new views, so changes can be found by comparing them with the
+    previous ones. Only pets that moved get a new record, everything else is
+    shared with the previous views.
+    """
+    merged = {
+        household_id: replace(household, pets=dict(household.pets), new_events=[])
+        for household_id, household in households.items()
+    }
+
+    for item in positions:
+        if (household := merged.get(item.get("household_id"))) is None:
+            continue
+        if (pet := household.pets.get(item.get("id"))) is None:
+            continue
+        position = item.get("position") or {}
+        location = _project_location(position.get("where"), position.get("since"))
+        if location != pet.location:
+            household.pets[item["id"]] = replace(pet, location=location)
+
+    return merged
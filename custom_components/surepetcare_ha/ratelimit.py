@@ -0,0 +1,237 @@
+"""Account-wide request budget for the Sure Petcare API."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+import heapq
+import itertools
+from types import SimpleNamespace
+from typing import Any, TypeVar
+
+from aiohttp import ClientSession, TraceConfig, TraceRequestEndParams, hdrs
+from surepy.exceptions import SurePetcareError
+
+from homeassistant.util import dt as dt_util
+
+from .const import LOGGER
+
+_T = TypeVar("_T")
+
+# Lower values are served first
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+
+
+class SurePetcareRateLimitedError(SurePetcareError):
+    """The API kept answering 429 Too Many Requests."""
+
+
+class _Attempt:
+    """One attempt of a limited call, told by the trace hook how it was answered."""
+
+    __slots__ = ("retry_after", "status")
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.retry_after: float | None = None
+        # HTTP status of the last response
+        self.status: int | None = None
+
+
+# The attempt running in the current task, read by the trace hook
+_ATTEMPT: ContextVar[_Attempt | None] = ContextVar("surepetcare_attempt", default=None)
+
+
+def last_response_status() -> int | None:
+    """Return the HTTP status of the last response of the running limited call.
+
+    surepy returns None for a 304 as well as for errors it does not raise on.
+    """
+    if (attempt := _ATTEMPT.get()) is None:
+        return None
+    return attempt.status
+
+
+def parse_retry_after(value: str | None, default: float) -> float:
+    """Return the seconds to wait from a Retry-After header."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - dt_util.utcnow()).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class RequestLimiter:
+    """Token bucket shared by every API call of an account.
+
+    Calls wait for a token in priority order, so commands overtake queued
+    background polls. A 429 response pauses the whole bucket for its
+    Retry-After time, after which the throttled call is sent again instead of
+    failing. 429s are seen through an aiohttp trace config, because surepy
+    does not report them.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        retries: int,
+        default_retry_after: float,
+        max_retry_after: float,
+    ) -> None:
+        """Initialize."""
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+        self._tokens = float(burst)
+        self._updated = 0.0
+        self._paused_until = 0.0
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._tickets = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.throttled = 0
+        self.calls = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of calls waiting for a token."""
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    @property
+    def paused_for(self) -> float:
+        """Return the seconds left of a 429 pause."""
+        return max(self._paused_until - asyncio.get_running_loop().time(), 0.0)
+
+    async def async_call(
+        self, priority: int, func: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Run an API call once a token is available, resending it when throttled."""
+        for attempt_number in range(self.retries + 1):
+            await self._async_acquire(priority)
+            self.calls += 1
+
+            attempt = _Attempt()
+            token = _ATTEMPT.set(attempt)
+            try:
+                result = await func()
+            except SurePetcareError:
+                if attempt.retry_after is None:
+                    raise
+            finally:
+                _ATTEMPT.reset(token)
+
+            if attempt.retry_after is None:
+                return result
+
+            LOGGER.debug(
+                "Sure Petcare API throttled, retrying in %.0f seconds (attempt %s)",
+                attempt.retry_after,
+                attempt_number + 1,
+            )
+
+        raise SurePetcareRateLimitedError(
+            f"Still rate limited after {self.retries} retries"
+        )
+
+    async def _async_acquire(self, priority: int) -> None:
+        """Wait for a token."""
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._tickets), future))
+        self._process()
+        await future
+
+    def _process(self) -> None:
+        """Hand out the available tokens and wait for the next one."""
+        loop = asyncio.get_running_loop()
+        if self._timer is not None:
+            # Called early by a new request, the pending wake-up is replaced
+            self._timer.cancel()
+            self._timer = None
+        now = loop.time()
+
+        self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+        self._updated = now
+
+        while self._queue:
+            if self._queue[0][2].done():
+                # Cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            if now < self._paused_until:
+                wake = self._paused_until
+            elif self._tokens < 1:
+                wake = now + (1 - self._tokens) / self.rate
+            else:
+                self._tokens -= 1
+                heapq.heappop(self._queue)[2].set_result(None)
+                continue
+
+            self._timer = loop.call_at(wake, self._process)
+            return
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while."""
+        loop = asyncio.get_running_loop()
+        self._paused_until = max(self._paused_until, loop.time() + seconds)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(self._paused_until, self._process)
+
+    def trace_config(self) -> TraceConfig:
+        """Return a trace config that pauses the bucket on 429 responses."""
+        trace_config = TraceConfig()
+        trace_config.on_request_end.append(self._on_request_end)
+        return trace_config
+
+    async def _on_request_end(
+        self,
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        params: TraceRequestEndParams,
+    ) -> None:
+        """Record the status and, on a 429, pause and mark the attempt for a retry."""
+        if params.method == hdrs.METH_OPTIONS:
+            # surepy's preflight before every call, not the call itself
+            return
+        attempt = _ATTEMPT.get()
+        if attempt is not None:
+            attempt.status = params.response.status
+        if params.response.status != HTTPStatus.TOO_MANY_REQUESTS:
+            return
+
+        retry_after = min(
+            parse_retry_after(
+                params.response.headers.get("Retry-After"), self.default_retry_after
+            ),
+            self.max_retry_after,
+        )
+        self.throttled += 1
+        LOGGER.warning(
+            "Sure Petcare API rate limit reached, pausing requests for %.0f seconds",
+            retry_after,
+        )
+        self.pause(retry_after)
+        if attempt is not None:
+            attempt.retry_after = retry_after
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the limiter state as plain values."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "queue_depth": self.queue_depth,
+            "paused_for": round(self.paused_for, 1),
+            "calls": self.calls,
+            "throttled": self.throttled,
+        }
@@ -0,0 +1,76 @@
+"""Adaptive polling interval for the Sure Petcare account poller."""
+from __future__ import annotations
+
+from datetime import timedelta
+import random
+import time
+
+
+class AdaptivePollScheduler:
+    """Compute the delay before the next account poll.
+
+    - Right after a command or a detected pet movement the account is polled
+      at the floor interval for a short window.
+    - While nothing happens the interval grows by the decay factor on every
+      poll until it reaches the ceiling.
+    - Repeated API errors back off exponentially, with jitter, up to the ceiling.
+    """
+
+    def __init__(
+        self,
+        base: timedelta,
+        floor: timedelta,
+        ceiling: timedelta,
+        decay: float,
+        boost_window: timedelta,
+    ) -> None:
+        """Initialize."""
+        self.base = base
+        self.boost_window = boost_window
+        self.configure(floor, ceiling, decay)
+        self._interval = self._clamp(base.total_seconds())
+        self._boost_until = 0.0
+        self.failures = 0
+
+    def configure(self, floor: timedelta, ceiling: timedelta, decay: float) -> None:
+        """Update the tunable limits."""
+        self.floor = floor.total_seconds()
+        self.ceiling = max(ceiling.total_seconds(), self.floor)
+        self.decay = max(decay, 1.0)
+
+    @property
+    def boosted(self) -> bool:
+        """Return True while the fast polling window is open."""
+        return time.monotonic() < self._boost_until
+
+    def boost(self) -> None:
+        """Poll at the floor interval for the next boost window."""
+        self._boost_until = time.monotonic() + self.boost_window.total_seconds()
+
+    def success(self, activity: bool) -> timedelta:
+        """Return the next interval after a successful poll."""
+        self.failures = 0
+
+        if activity:
+            self.boost()
+
+        if self.boosted:
+            self._interval = self.floor
+        elif self._interval < self.base.total_seconds():
+            # Fast window is over, go back to the normal pace
+            self._interval = self._clamp(self.base.total_seconds())
+        else:
+            self._interval = self._clamp(self._interval * self.decay)
+
+        return timedelta(seconds=self._interval)
+
+    def failure(self) -> timedelta:
+        """Return the next interval after a failed poll."""
+        self.failures += 1
+        backoff = self._clamp(self.base.total_seconds() * 2 ** (self.failures - 1))
+        # Equal jitter keeps retries from many hosts from lining up
+        return timedelta(seconds=self._clamp(backoff / 2 + random.uniform(0, backoff / 2)))
+
+    def _clamp(self, seconds: float) -> float:
+        """Keep an interval between floor and ceiling."""
+        return min(max(seconds, self.floor), self.ceiling)
@@ -1,16 +1,16 @@
 """Support for Sure Petcare select entities."""
 from __future__ import annotations
 
-from typing import Any
-
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import COMMAND_LOCK, DOMAIN
 from .coordinator import SurePetcareDataUpdateCoordinator
+from .entity import SurePetcareEntity
+from .models import Command, lock_state
 
 # Map indices to human-readable states as decided in Phase 1 Context
 LOCK_STATE_MAP = {
@@ -31,16 +31,27 @@ async def async_setup_entry(
     """Set up Sure Petcare select platform."""
     coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: list[SelectEntity] = []
+    household_select_added = False
+
+    def _build_entities(pet_ids: set[int], device_ids: set[int]) -> list[SelectEntity]:
+        """Create the entities of the given lock-capable devices."""
+        nonlocal household_select_added
+        entities: list[SelectEntity] = [
+            SurePetcareSelect(coordinator, device_id)
+            for device_id in coordinator.data.locking_devices
+            if device_id in device_ids
+        ]
+
+        # One select that sets every flap of the household, once there is a flap
+        if entities and not household_select_added:
+            entities.append(SurePetcareHouseholdSelect(coordinator, entry.title))
+            household_select_added = True
 
-    for device_id, device in coordinator.data.devices.items():
-        if device.household_id == coordinator.household_id:
-            if hasattr(device.status, "locking"):
-                entities.append(SurePetcareSelect(coordinator, device_id))
+        return entities
 
-    async_add_entities(entities)
+    coordinator.async_add_entity_factory(_build_entities, async_add_entities)
 
-class SurePetcareSelect(CoordinatorEntity[SurePetcareDataUpdateCoordinator], SelectEntity):
+class SurePetcareSelect(SurePetcareEntity, SelectEntity):
     """Sure Petcare lock state select entity."""
 
     _attr_options = list(LOCK_STATE_MAP.values())
@@ -48,7 +59,7 @@ class SurePetcareSelect(CoordinatorEntity[SurePetcareDataUpdateCoordinator], Sel
 
     def __init__(self, coordinator: SurePetcareDataUpdateCoordinator, device_id: int) -> None:
         """Initialize the select entity."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=("device", device_id))
         self._device_id = device_id
         device = coordinator.data.devices[device_id]
         self._attr_name = f"{device.name} Lock Mode"
@@ -58,33 +69,62 @@ class SurePetcareSelect(CoordinatorEntity[SurePetcareDataUpdateCoordinator], Sel
     def current_option(self) -> str | None:
         """Return the selected entity option to represent the entity state."""
         device = self.coordinator.data.devices.get(self._device_id)
-        if not device or not hasattr(device.status, "locking"):
+        if not device or device.status.locking is None:
             return None
-            
-        locking_state = device.status.locking
-        if not isinstance(locking_state, int):
-            locking_state = getattr(locking_state, "value", locking_state)
-            
+
+        locking_state = self.coordinator.optimistic_value(
+            ("device", self._device_id), "locking", lock_state(device)
+        )
+
         return LOCK_STATE_MAP.get(locking_state)
 
     async def async_select_option(self, option: str) -> None:
         """Change the selected option."""
         if (state_index := LOCK_STATE_REVERSE_MAP.get(option)) is not None:
-            # Pessimistic update: Call API then refresh coordinator
-            await self.coordinator.api.sac.set_lock_state(self._device_id, state_index)
-            await self.coordinator.async_request_refresh()
+            # Shown once the API acknowledged it, a coalesced refresh confirms it
+            [result] = await self.coordinator.async_run_commands(
+                [Command(COMMAND_LOCK, self._device_id, state_index)]
+            )
+            if not result.success:
+                raise HomeAssistantError(
+                    f"Error setting lock mode of {self.name}: {result.error}"
+                )
+
+
+class SurePetcareHouseholdSelect(SurePetcareEntity, SelectEntity):
+    """Sure Petcare lock state of all flaps of a household."""
+
+    _attr_options = list(LOCK_STATE_MAP.values())
+    _attr_icon = "mdi:lock-cog"
+
+    def __init__(self, coordinator: SurePetcareDataUpdateCoordinator, title: str) -> None:
+        """Initialize the select entity."""
+        # No context, so the select follows every flap of the household
+        super().__init__(coordinator)
+        self._attr_name = f"{title} Lock Mode"
+        self._attr_unique_id = f"household_{coordinator.household_id}_lock_mode"
 
     @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        device = self.coordinator.data.devices[self._device_id]
-        model = None
-        if hasattr(device, "type"):
-            model = getattr(device.type, "name", str(device.type)).replace("_", " ").title()
-
-        return {
-            "identifiers": {(DOMAIN, str(self._device_id))},
-            "name": device.name,
-            "manufacturer": "Sure Petcare",
-            "model": model,
+    def current_option(self) -> str | None:
+        """Return the lock state shared by all flaps, None if they differ."""
+        data = self.coordinator.data
+        states = {
+            self.coordinator.optimistic_value(
+                ("device", device_id), "locking", lock_state(data.devices[device_id])
+            )
+            for device_id in data.locking_devices
         }
+        if len(states) != 1:
+            return None
+        return LOCK_STATE_MAP.get(states.pop())
+
+    async def async_select_option(self, option: str) -> None:
+        """Set every flap of the household to the selected option."""
+        if (state_index := LOCK_STATE_REVERSE_MAP.get(option)) is None:
+            return
+        results = await self.coordinator.async_set_lock_mode(state_index)
+        if failed := [result for result in results if not result.success]:
+            errors = ", ".join(
+                f"{result.command.target_id}: {result.error}" for result in failed
+            )
+            raise HomeAssistantError(f"Error setting lock mode of devices {errors}")
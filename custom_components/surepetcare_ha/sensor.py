@@ -1,6 +1,7 @@
 """Support for Sure Petcare sensors."""
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -9,13 +10,23 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE, EntityCategory
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfMass,
+    UnitOfTime,
+    UnitOfVolume,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
+from .consumption import FOOD, WATER, bowl_key, device_key, pet_key
 from .coordinator import SurePetcareDataUpdateCoordinator
+from .entity import SurePetcareEntity
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -25,37 +36,105 @@ async def async_setup_entry(
     """Set up Sure Petcare sensors."""
     coordinator: SurePetcareDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: list[SensorEntity] = []
+    # Kinds the household can measure, so their pet sensors exist
+    pet_consumption: set[str] = set()
 
-    # Add sensors for devices
-    for device_id, device in coordinator.data.devices.items():
-        if device.household_id == coordinator.household_id:
-            # Check if device has battery info (Hub usually doesn't, others do)
-            if hasattr(device.status, "battery") or hasattr(device.status, "low_battery"):
-                entities.append(SurePetcareBatterySensor(coordinator, device_id))
-            
+    def _build_entities(pet_ids: set[int], device_ids: set[int]) -> list[SensorEntity]:
+        """Create the sensors of the given pets and devices."""
+        entities: list[SensorEntity] = []
+
+        data = coordinator.data
+
+        # Add sensors for devices
+        for device_id in device_ids:
+            device = data.devices[device_id]
             entities.append(SurePetcareLastSeenSensor(coordinator, device_id, "device"))
-            
+
             if getattr(device, "serial_number", None):
                 entities.append(SurePetcareInfoSensor(coordinator, device_id, "serial"))
-            
+
             if getattr(device, "product_id", None):
                 entities.append(SurePetcareInfoSensor(coordinator, device_id, "product"))
 
-            if hasattr(device.status, "curfew"):
-                entities.append(SurePetcareCurfewSensor(coordinator, device_id))
-
-    # Add sensors for pets
-    for pet_id, pet in coordinator.data.pets.items():
-        if pet.household_id == coordinator.household_id:
+        # Battery info (Hub usually doesn't have it, others do)
+        entities.extend(
+            SurePetcareBatterySensor(coordinator, device_id)
+            for device_id in data.battery_devices
+            if device_id in device_ids
+        )
+        for device_id in data.curfew_devices:
+            if device_id not in device_ids:
+                continue
+            entities.append(SurePetcareCurfewSensor(coordinator, device_id))
+            entities.extend(
+                SurePetcareCurfewScheduleSensor(coordinator, device_id, metric)
+                for metric in CURFEW_METRICS
+            )
+
+        # Food per bowl and water per station
+        for device_id in data.feeder_devices:
+            if device_id not in device_ids:
+                continue
+            for index in range(data.devices[device_id].bowl_count or 1):
+                entities.extend(
+                    SurePetcareConsumptionSensor(
+                        coordinator, FOOD, period, "device", device_id, index
+                    )
+                    for period in CONSUMPTION_PERIODS
+                )
+        for device_id in data.water_devices:
+            if device_id not in device_ids:
+                continue
+            entities.extend(
+                SurePetcareConsumptionSensor(coordinator, WATER, period, "device", device_id)
+                for period in CONSUMPTION_PERIODS
+            )
+
+        # Add sensors for pets
+        for pet_id in pet_ids:
             entities.append(SurePetcareLastSeenSensor(coordinator, pet_id, "pet"))
-            # Check if pet has battery info
-            if hasattr(pet.status, "battery") or hasattr(pet.status, "low_battery"):
-                entities.append(SurePetcareBatterySensor(coordinator, pet_id, "pet"))
-
-    async_add_entities(entities)
-
-class SurePetcareSensor(CoordinatorEntity[SurePetcareDataUpdateCoordinator], SensorEntity):
+            entities.extend(
+                SurePetcareActivitySensor(coordinator, pet_id, metric)
+                for metric in ACTIVITY_METRICS
+            )
+
+        # Food and water per pet, for every pet once the first feeder or water
+        # station appears, then for new pets
+        for kind, devices in ((FOOD, data.feeder_devices), (WATER, data.water_devices)):
+            if not devices:
+                continue
+            if kind in pet_consumption:
+                consumption_pets = pet_ids
+            else:
+                consumption_pets = set(data.pets)
+                pet_consumption.add(kind)
+            entities.extend(
+                SurePetcareConsumptionSensor(coordinator, kind, period, "pet", pet_id)
+                for pet_id in consumption_pets
+                for period in CONSUMPTION_PERIODS
+            )
+        entities.extend(
+            SurePetcareBatterySensor(coordinator, pet_id, "pet")
+            for pet_id in data.battery_pets
+            if pet_id in pet_ids
+        )
+
+        return entities
+
+    coordinator.async_add_entity_factory(_build_entities, async_add_entities)
+
+    @callback
+    def _add_metrics() -> None:
+        async_add_entities(
+            SurePetcarePollMetricSensor(coordinator, metric) for metric in POLL_METRICS
+        )
+
+    # Polling metrics of the account, shown by one of its entries and disabled
+    # unless enabled by the user. When that entry is unloaded another one
+    # adds them, without a reload.
+    coordinator.account.async_add_metrics_platform(entry.entry_id, _add_metrics)
+
+class SurePetcareSensor(SurePetcareEntity, SensorEntity):
     """Base class for Sure Petcare sensors."""
 
     def __init__(
@@ -63,11 +142,13 @@ class SurePetcareSensor(CoordinatorEntity[SurePetcareDataUpdateCoordinator], Sen
         coordinator: SurePetcareDataUpdateCoordinator,
         unique_id: int,
         identifier: str,
+        target_type: str = "device",
     ) -> None:
         """Initialize."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=(target_type, unique_id))
         self._unique_id = unique_id
         self._identifier = identifier
+        self._target_type = target_type
 
     @property
     def unique_id(self) -> str:
@@ -84,8 +165,7 @@ class SurePetcareBatterySensor(SurePetcareSensor):
 
     def __init__(self, coordinator: SurePetcareDataUpdateCoordinator, unique_id: int, target_type: str = "device") -> None:
         """Initialize."""
-        super().__init__(coordinator, unique_id, "battery")
-        self._target_type = target_type
+        super().__init__(coordinator, unique_id, "battery", target_type)
         if target_type == "pet":
             pet = self.coordinator.data.pets[unique_id]
             self._attr_name = f"{pet.name} Battery"
@@ -114,29 +194,6 @@ class SurePetcareBatterySensor(SurePetcareSensor):
         low_battery = getattr(entity.status, "low_battery", False)
         return 10 if low_battery else 100
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        if self._target_type == "pet":
-            pet = self.coordinator.data.pets[self._unique_id]
-            return {
-                "identifiers": {(DOMAIN, f"pet_{self._unique_id}")},
-                "name": pet.name,
-                "manufacturer": "Sure Petcare",
-                "model": "Pet",
-            }
-
-        device = self.coordinator.data.devices[self._unique_id]
-        model = None
-        if hasattr(device, "type"):
-            model = getattr(device.type, "name", str(device.type)).replace("_", " ").title()
-            
-        return {
-            "identifiers": {(DOMAIN, str(self._unique_id))},
-            "name": device.name,
-            "manufacturer": "Sure Petcare",
-            "model": model,
-        }
 
 class SurePetcareLastSeenSensor(SurePetcareSensor):
     """Sure Petcare last seen sensor."""
@@ -146,8 +203,7 @@ class SurePetcareLastSeenSensor(SurePetcareSensor):
 
     def __init__(self, coordinator: SurePetcareDataUpdateCoordinator, unique_id: int, target_type: str) -> None:
         """Initialize."""
-        super().__init__(coordinator, unique_id, "last_seen")
-        self._target_type = target_type
+        super().__init__(coordinator, unique_id, "last_seen", target_type)
         if target_type == "pet":
             pet = self.coordinator.data.pets[unique_id]
             self._attr_name = f"{pet.name} Last Seen"
@@ -174,29 +230,6 @@ class SurePetcareLastSeenSensor(SurePetcareSensor):
             
         return getattr(entity.status, "since", None)
 
-    @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        if self._target_type == "pet":
-            pet = self.coordinator.data.pets[self._unique_id]
-            return {
-                "identifiers": {(DOMAIN, f"pet_{self._unique_id}")},
-                "name": pet.name,
-                "manufacturer": "Sure Petcare",
-                "model": "Pet",
-            }
-        
-        device = self.coordinator.data.devices[self._unique_id]
-        model = None
-        if hasattr(device, "type"):
-            model = getattr(device.type, "name", str(device.type)).replace("_", " ").title()
-
-        return {
-            "identifiers": {(DOMAIN, str(self._unique_id))},
-            "name": device.name,
-            "manufacturer": "Sure Petcare",
-            "model": model,
-        }
 
 class SurePetcareInfoSensor(SurePetcareSensor):
     """Sure Petcare information sensor."""
@@ -224,20 +257,188 @@ class SurePetcareInfoSensor(SurePetcareSensor):
             return getattr(device, "serial_number", None)
         return getattr(device, "product_id", None)
 
+
+# Metric key: (name, icon)
+ACTIVITY_METRICS: dict[str, tuple[str, str]] = {
+    "time_outside": ("Time Outside Today", "mdi:tree"),
+    "trips": ("Trips Today", "mdi:door-open"),
+    "longest_trip": ("Longest Trip Today", "mdi:timer-outline"),
+}
+
+
+class SurePetcareActivitySensor(SurePetcareSensor):
+    """Sure Petcare daily outdoor activity of a pet."""
+
+    def __init__(
+        self, coordinator: SurePetcareDataUpdateCoordinator, unique_id: int, metric: str
+    ) -> None:
+        """Initialize."""
+        # Notified on location changes, and on every poll while the pet is out
+        super().__init__(coordinator, unique_id, metric, "activity")
+        self._metric = metric
+        name, icon = ACTIVITY_METRICS[metric]
+        pet = self.coordinator.data.pets[unique_id]
+        self._attr_name = f"{pet.name} {name}"
+        self._attr_icon = icon
+        if metric == "trips":
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._attr_device_class = SensorDeviceClass.DURATION
+            self._attr_native_unit_of_measurement = UnitOfTime.MINUTES
+            self._attr_suggested_display_precision = 0
+            if metric == "time_outside":
+                self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        return f"pet_{self._unique_id}_{self._identifier}"
+
+    @property
+    def device_info(self) -> DeviceInfo | None:
+        """Return the device information of the pet."""
+        return self.coordinator.device_info(("pet", self._unique_id))
+
     @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        device = self.coordinator.data.devices[self._unique_id]
-        model = None
-        if hasattr(device, "type"):
-            model = getattr(device.type, "name", str(device.type)).replace("_", " ").title()
-
-        return {
-            "identifiers": {(DOMAIN, str(self._unique_id))},
-            "name": device.name,
-            "manufacturer": "Sure Petcare",
-            "model": model,
-        }
+    def native_value(self) -> float | int:
+        """Return the state of the sensor."""
+        activity = self.coordinator.activity
+        if self._metric == "trips":
+            return activity.trips(self._unique_id)
+        if self._metric == "time_outside":
+            return round(activity.time_outside(self._unique_id) / 60, 1)
+        return round(activity.longest_trip(self._unique_id) / 60, 1)
+
+
+CONSUMPTION_PERIODS = ("today", "week")
+
+
+class SurePetcareConsumptionSensor(SurePetcareSensor):
+    """Sure Petcare food or water consumption of a pet, bowl or water station."""
+
+    def __init__(
+        self,
+        coordinator: SurePetcareDataUpdateCoordinator,
+        kind: str,
+        period: str,
+        target_type: str,
+        unique_id: int,
+        bowl_index: int | None = None,
+    ) -> None:
+        """Initialize."""
+        identifier = f"{kind}_{period}"
+        if bowl_index is not None:
+            identifier = f"bowl_{bowl_index}_{identifier}"
+        super().__init__(coordinator, unique_id, identifier, target_type)
+        self._kind = kind
+        self._period = period
+
+        if target_type == "pet":
+            self._key = pet_key(unique_id)
+            name = self.coordinator.data.pets[unique_id].name
+        else:
+            self._key = (
+                device_key(unique_id) if bowl_index is None else bowl_key(unique_id, bowl_index)
+            )
+            name = self.coordinator.data.devices[unique_id].name
+            if bowl_index is not None:
+                name = f"{name} Bowl {bowl_index + 1}"
+
+        label = "Food" if kind == FOOD else "Water"
+        self._attr_name = f"{name} {label} {'Today' if period == 'today' else 'Last 7 Days'}"
+        self._attr_icon = "mdi:food-drumstick" if kind == FOOD else "mdi:water"
+        if kind == FOOD:
+            self._attr_device_class = SensorDeviceClass.WEIGHT
+            self._attr_native_unit_of_measurement = UnitOfMass.GRAMS
+        else:
+            self._attr_device_class = SensorDeviceClass.VOLUME
+            self._attr_native_unit_of_measurement = UnitOfVolume.MILLILITERS
+        # Daily totals reset at midnight, the rolling week has no statistics
+        if period == "today":
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def unique_id(self) -> str:
+        """Return a unique ID."""
+        prefix = "pet_" if self._target_type == "pet" else ""
+        return f"{prefix}{self._unique_id}_{self._identifier}"
+
+    @property
+    def native_value(self) -> float:
+        """Return the state of the sensor."""
+        consumption = self.coordinator.consumption
+        if self._period == "today":
+            return consumption.today(self._kind, self._key)
+        return consumption.week(self._kind, self._key)
+
+
+# Metric key: (name, unit, state class)
+POLL_METRICS: dict[str, tuple[str, str | None, SensorStateClass]] = {
+    "api_time": ("API Latency", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT),
+    "fanout_time": ("Update Fan-out Time", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT),
+    "loop_time": ("Event Loop Time", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT),
+    "poll_interval": ("Poll Interval", UnitOfTime.SECONDS, SensorStateClass.MEASUREMENT),
+    "payload": ("Poll Payload Size", UnitOfInformation.BYTES, SensorStateClass.MEASUREMENT),
+    "api_calls": ("API Calls", None, SensorStateClass.TOTAL_INCREASING),
+    "errors": ("Poll Errors", None, SensorStateClass.TOTAL_INCREASING),
+    "entity_updates": ("Entity Updates per Poll", None, SensorStateClass.MEASUREMENT),
+    "queue_depth": ("API Queue Depth", None, SensorStateClass.MEASUREMENT),
+    "throttled": ("API Rate Limited", None, SensorStateClass.TOTAL_INCREASING),
+    "unchanged_polls": ("Unchanged Polls", None, SensorStateClass.TOTAL_INCREASING),
+}
+
+
+class SurePetcarePollMetricSensor(SurePetcareEntity, SensorEntity):
+    """Sure Petcare polling metric of the account."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:chart-timeline-variant"
+
+    def __init__(self, coordinator: SurePetcareDataUpdateCoordinator, metric: str) -> None:
+        """Initialize."""
+        # No context, so the sensor is updated by every poll
+        super().__init__(coordinator)
+        self._metric = metric
+        name, unit, state_class = POLL_METRICS[metric]
+        self._attr_name = f"Sure Petcare {name}"
+        self._attr_unique_id = f"account_{coordinator.account.account_id}_{metric}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+    @property
+    def available(self) -> bool:
+        """Metrics stay available when a poll fails."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the state of the sensor."""
+        account = self.coordinator.account
+        metrics = account.metrics
+
+        if self._metric == "api_time":
+            return round(metrics.api_time.last * 1000, 1) if metrics.api_time.count else None
+        if self._metric == "fanout_time":
+            return round(metrics.fanout_time.last * 1000, 1) if metrics.fanout_time.count else None
+        if self._metric == "loop_time":
+            return round(metrics.loop_time.last * 1000, 1) if metrics.loop_time.count else None
+        if self._metric == "poll_interval":
+            return account.update_interval.total_seconds() if account.update_interval else None
+        if self._metric == "payload":
+            return metrics.last_payload_bytes
+        if self._metric == "api_calls":
+            return sum(metrics.api_calls.values())
+        if self._metric == "errors":
+            return metrics.errors
+        if self._metric == "queue_depth":
+            return account.limiter.queue_depth
+        if self._metric == "throttled":
+            return account.limiter.throttled
+        if self._metric == "unchanged_polls":
+            return metrics.unchanged_polls
+        return metrics.last_entity_updates
+
 
 class SurePetcareCurfewSensor(SurePetcareSensor):
     """Sure Petcare curfew sensor."""
@@ -254,33 +455,63 @@ class SurePetcareCurfewSensor(SurePetcareSensor):
     @property
     def native_value(self) -> str:
         """Return the state of the sensor."""
-        device = self.coordinator.data.devices.get(self._unique_id)
-        if not device:
+        schedule = self.coordinator.curfews.schedule(self._unique_id)
+        if schedule is None:
             return "Unknown"
-        
-        # Based on Sure Petcare API, curfew status is often in device.status.curfew
-        # We check if any curfew is enabled.
-        curfews = getattr(device.status, "curfew", [])
-        
-        # Handle both list and single object
-        if isinstance(curfews, list):
-            active = any(getattr(c, "enabled", False) for c in curfews)
-        else:
-            active = getattr(curfews, "enabled", False)
-            
-        return "Enabled" if active else "Disabled"
+
+        return "Enabled" if schedule.enabled else "Disabled"
+
+
+# Metric: (name, icon)
+CURFEW_METRICS = {
+    "curfew_active": ("Curfew Active", "mdi:clock-alert"),
+    "curfew_next_transition": ("Next Curfew Transition", "mdi:clock-end"),
+}
+
+
+class SurePetcareCurfewScheduleSensor(SurePetcareSensor):
+    """Sure Petcare curfew state of a flap, following its schedule."""
+
+    def __init__(
+        self, coordinator: SurePetcareDataUpdateCoordinator, unique_id: int, metric: str
+    ) -> None:
+        """Initialize."""
+        # Notified when the schedule changes and at every lock and unlock time
+        super().__init__(coordinator, unique_id, metric, "curfew")
+        self._metric = metric
+        name, icon = CURFEW_METRICS[metric]
+        device = self.coordinator.data.devices[unique_id]
+        self._attr_name = f"{device.name} {name}"
+        self._attr_icon = icon
+        if metric == "curfew_next_transition":
+            self._attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    @property
+    def device_info(self) -> DeviceInfo | None:
+        """Return the device information of the flap."""
+        return self.coordinator.device_info(("device", self._unique_id))
+
+    @property
+    def native_value(self) -> str | datetime | None:
+        """Return the state of the sensor."""
+        curfews = self.coordinator.curfews
+        if self._metric == "curfew_active":
+            if (schedule := curfews.schedule(self._unique_id)) is None:
+                return None
+            return "Active" if schedule.active_at(dt_util.now()) else "Inactive"
+
+        if (transition := curfews.next_transitions.get(self._unique_id)) is None:
+            return None
+        return transition[0]
 
     @property
-    def device_info(self) -> dict[str, Any]:
-        """Return device information."""
-        device = self.coordinator.data.devices[self._unique_id]
-        model = None
-        if hasattr(device, "type"):
-            model = getattr(device.type, "name", str(device.type)).replace("_", " ").title()
-
-        return {
-            "identifiers": {(DOMAIN, str(self._unique_id))},
-            "name": device.name,
-            "manufacturer": "Sure Petcare",
-            "model": model,
-        }
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return whether the next transition locks or unlocks the flap."""
+        attributes = super().extra_state_attributes
+        if self._metric != "curfew_next_transition":
+            return attributes
+        next_state = None
+        transition = self.coordinator.curfews.next_transitions.get(self._unique_id)
+        if transition is not None:
+            next_state = "locked" if transition[1] else "unlocked"
+        return {**(attributes or {}), "next_state": next_state}
@@ -0,0 +1,140 @@
+"""Persisted household snapshots for warm starts."""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER, SNAPSHOT_SAVE_DELAY
+from .models import (
+    CurfewRecord,
+    DeviceRecord,
+    HouseholdData,
+    LocationRecord,
+    PetRecord,
+    StatusRecord,
+)
+
+SNAPSHOT_VERSION = 1
+
+# Attributes kept per pet and device, nested records list their own fields.
+# Anything a platform reads must be listed here to survive a restart.
+PET_FIELDS = ("name", "household_id", "photo_url", "species_name")
+PET_LOCATION_FIELDS = ("where", "since")
+DEVICE_FIELDS = (
+    "name",
+    "household_id",
+    "serial_number",
+    "product_id",
+    "type",
+    "bowl_count",
+)
+STATUS_FIELDS = ("since", "locking", "curfew", "low_battery", "battery")
+CURFEW_FIELDS = ("enabled", "lock_time", "unlock_time")
+
+
+def _plain(value: Any) -> Any:
+    """Convert a model value to something JSON serializable."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    # Curfew entries are the only nested objects kept
+    return _pick(value, CURFEW_FIELDS)
+
+
+def _pick(obj: Any, fields: tuple[str, ...]) -> dict[str, Any]:
+    """Return the set attributes of a record as plain values."""
+    return {
+        name: _plain(value) for name in fields if (value := getattr(obj, name)) is not None
+    }
+
+
+def _since(values: dict[str, Any]) -> dict[str, Any]:
+    """Parse a stored "since" timestamp."""
+    if values.get("since") is not None:
+        values["since"] = dt_util.parse_datetime(values["since"])
+    return values
+
+
+def _status(values: dict[str, Any]) -> StatusRecord:
+    """Rebuild a status record from stored values."""
+    if (curfew := values.get("curfew")) is not None:
+        values["curfew"] = [
+            CurfewRecord(**item) for item in (curfew if isinstance(curfew, list) else [curfew])
+        ]
+    return StatusRecord(**_since(values))
+
+
+def encode_household(data: HouseholdData) -> dict[str, Any]:
+    """Encode the parts of a household view the platforms read."""
+    pets = {}
+    for pet_id, pet in data.pets.items():
+        pets[str(pet_id)] = {
+            **_pick(pet, PET_FIELDS),
+            "location": _pick(pet.location, PET_LOCATION_FIELDS),
+            "status": _pick(pet.status, STATUS_FIELDS),
+        }
+
+    devices = {}
+    for device_id, device in data.devices.items():
+        devices[str(device_id)] = {
+            **_pick(device, DEVICE_FIELDS),
+            "status": _pick(device.status, STATUS_FIELDS),
+        }
+
+    return {"household_id": data.household_id, "pets": pets, "devices": devices}
+
+
+def decode_household(stored: dict[str, Any]) -> HouseholdData:
+    """Rebuild an indexed household view from its stored form."""
+    data = HouseholdData(stored["household_id"])
+
+    for device_id, values in stored["devices"].items():
+        status = _status(values.pop("status"))
+        data.add_device(int(device_id), DeviceRecord(**values, status=status))
+
+    for pet_id, values in stored["pets"].items():
+        location = LocationRecord(**_since(values.pop("location")))
+        status = _status(values.pop("status"))
+        data.add_pet(int(pet_id), PetRecord(**values, location=location, status=status))
+
+    return data
+
+
+class SnapshotStore:
+    """Keep the last good view of a household in Home Assistant storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_VERSION, f"{DOMAIN}.{entry_id}.snapshot"
+        )
+
+    async def async_load(self) -> HouseholdData | None:
+        """Load the stored view, None if there is none or it is unreadable."""
+        if (stored := await self._store.async_load()) is None:
+            return None
+
+        try:
+            return decode_household(stored)
+        except (KeyError, TypeError, ValueError) as err:
+            LOGGER.warning("Ignoring unreadable Sure Petcare snapshot: %s", err)
+            return None
+
+    @callback
+    def async_schedule_save(self, data: HouseholdData) -> None:
+        """Save the view after a delay, coalescing frequent polls."""
+        self._store.async_delay_save(lambda: encode_household(data), SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the stored view."""
+        await self._store.async_remove()
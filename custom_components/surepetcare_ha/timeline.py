@@ -0,0 +1,128 @@
+"""Incremental ingestion of the Sure Petcare household timeline."""
+from __future__ import annotations
+
+from collections import deque
+from functools import partial
+from typing import Any
+
+from surepy import Surepy
+from surepy.const import BASE_RESOURCE
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    TIMELINE_BUFFER_SIZE,
+    TIMELINE_MAX_PAGES,
+    TIMELINE_PAGE_SIZE,
+    TIMELINE_SAVE_DELAY,
+)
+from .ratelimit import PRIORITY_POLL, RequestLimiter
+
+TIMELINE_VERSION = 1
+TIMELINE_STORAGE_KEY = DOMAIN + ".{entry_id}.timeline"
+
+TIMELINE_RESOURCE = "{base}/timeline/household/{household_id}?page={page}&page_size={page_size}"
+TIMELINE_SINCE_RESOURCE = TIMELINE_RESOURCE + "&since_id={since_id}"
+
+# Parts of a timeline event worth keeping
+EVENT_FIELDS = ("id", "type", "created_at", "pets", "devices", "movements", "weights")
+
+
+def _compact(event: dict[str, Any]) -> dict[str, Any]:
+    """Drop the parts of an event nothing reads."""
+    return {key: event[key] for key in EVENT_FIELDS if key in event}
+
+
+class TimelineIngester:
+    """Follow the timeline of a household with a cursor.
+
+    Each update only asks for events newer than the last one seen, so its cost
+    does not grow with how long the integration has been running. The latest
+    events are kept in a bounded ring buffer that survives restarts.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: Surepy,
+        limiter: RequestLimiter,
+        household_id: int,
+        entry_id: str,
+    ) -> None:
+        """Initialize."""
+        self.api = api
+        self.limiter = limiter
+        self.household_id = household_id
+        # Id of the newest event seen, None until the first update
+        self.cursor: int | None = None
+        self.events: deque[dict[str, Any]] = deque(maxlen=TIMELINE_BUFFER_SIZE)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, TIMELINE_VERSION, TIMELINE_STORAGE_KEY.format(entry_id=entry_id)
+        )
+
+    async def async_load(self) -> None:
+        """Restore the cursor and buffered events."""
+        if (stored := await self._store.async_load()) is None:
+            return
+        self.cursor = stored.get("cursor")
+        self.events.extend(stored.get("events", []))
+
+    async def async_update(self) -> list[dict[str, Any]]:
+        """Fetch the events added since the last update, oldest first."""
+        new_events: list[dict[str, Any]] = []
+
+        for page in range(1, TIMELINE_MAX_PAGES + 1):
+            if self.cursor is None:
+                # First run, start from the latest page instead of the whole history
+                resource = TIMELINE_RESOURCE.format(
+                    base=BASE_RESOURCE,
+                    household_id=self.household_id,
+                    page=page,
+                    page_size=TIMELINE_PAGE_SIZE,
+                )
+            else:
+                resource = TIMELINE_SINCE_RESOURCE.format(
+                    base=BASE_RESOURCE,
+                    household_id=self.household_id,
+                    page=page,
+                    page_size=TIMELINE_PAGE_SIZE,
+                    since_id=self.cursor,
+                )
+
+            response = await self.limiter.async_call(
+                PRIORITY_POLL, partial(self.api.sac.call, method="GET", resource=resource)
+            )
+            batch = (response or {}).get("data") or []
+            new_events.extend(batch)
+
+            if self.cursor is None or len(batch) < TIMELINE_PAGE_SIZE:
+                break
+
+        if self.cursor is not None:
+            new_events = [event for event in new_events if event["id"] > self.cursor]
+        if not new_events:
+            return []
+
+        new_events.sort(key=lambda event: event["id"])
+        self.cursor = new_events[-1]["id"]
+        self.events.extend(_compact(event) for event in new_events)
+        self._async_schedule_save()
+
+        return new_events
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Save the cursor and buffer after a delay."""
+        self._store.async_delay_save(
+            lambda: {"cursor": self.cursor, "events": list(self.events)},
+            TIMELINE_SAVE_DELAY,
+        )
+
+
+async def async_remove_timeline(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored timeline of a config entry."""
+    await Store(
+        hass, TIMELINE_VERSION, TIMELINE_STORAGE_KEY.format(entry_id=entry_id)
+    ).async_remove()